@@ -1,88 +1,388 @@
 import base64
 import zlib
-import olefile
 import io
 import sys
 import os
 import struct
 from datetime import datetime
 import binascii
+import contextlib
+import shutil
+from collections import namedtuple
+from wellcat_io import open_buffer
+from wellcat_profile import NULL_INSTRUMENTATION
 
-def analyze_edm_file(file_path):
-    print(f"Analyzing file: {file_path}")
+# Chunk size for the streaming extraction pipeline
+CHUNK_SIZE = 1 << 20
+
+# OLE stream that holds the StressData records
+CONTENTS_STREAM = 'Contents'
+
+BASE64_ALPHABET = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/='
+# Everything outside the alphabet (newlines etc.) is dropped before decoding
+NON_BASE64 = bytes(sorted(set(range(256)) - set(BASE64_ALPHABET)))
+
+# Bytes of the payload inspected to detect its format
+SNIFF_BYTES = 128
+
+CFBF_SIGNATURE = b'\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1'
+GZIP_MAGIC = b'\x1F\x8B'
+
+# zlib window bits for each compression codec
+CODEC_WBITS = {'zlib': 15, 'gzip': 31, 'deflate': -15}
+
+# Formats sniff_payload recognises, for error messages
+KNOWN_FORMATS = 'base64 text, CFBF container, gzip, zlib or raw deflate'
+
+PayloadFormat = namedtuple('PayloadFormat', ['encoding', 'codec'])
+
+
+def _looks_like_base64(head):
+    """Check if data is base64 encoded (based on first few characters)"""
+    # Deleting the alphabet and line breaks leaves nothing for base64 text
+    return bool(head) and not head[:100].translate(None, BASE64_ALPHABET + b'\r\n')
+
+
+def _is_zlib_header(head):
+    """Check for a zlib stream header (RFC 1950): deflate method, window <= 32K, valid check bits"""
+    if len(head) < 2:
+        return False
+    cmf, flg = head[0], head[1]
+    return cmf & 0x0F == 8 and cmf >> 4 <= 7 and (cmf << 8 | flg) % 31 == 0
+
+
+def detect_codec(head):
+    """Name the format of a binary payload from its first bytes
+
+    Returns 'cfbf' for an uncompressed container, 'zlib' or 'gzip' for a
+    stream with that header, 'deflate' for a headerless deflate stream
+    (its first bytes inflate without error), or None if nothing matches.
+    """
+    if head.startswith(CFBF_SIGNATURE):
+        return 'cfbf'
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if _is_zlib_header(head):
+        return 'zlib'
+    # Raw deflate has no magic, so try to inflate the head; arbitrary bytes
+    # almost always hit an invalid block type, length or code within it
+    if head:
+        try:
+            zlib.decompressobj(wbits=CODEC_WBITS['deflate']).decompress(head)
+            return 'deflate'
+        except zlib.error:
+            pass
+    return None
+
+
+def sniff_payload(head):
+    """Detect how an EDM payload is encoded from its first bytes
+
+    Returns a PayloadFormat: encoding is 'base64' or 'binary', and codec is
+    what detect_codec finds under that encoding (for base64, in the decoded
+    head). Only the head is decoded, so the payload itself is decoded once.
+    """
+    head = bytes(head[:SNIFF_BYTES])
+    if _looks_like_base64(head):
+        encoded = head.translate(None, NON_BASE64)
+        try:
+            decoded = binascii.a2b_base64(encoded[:len(encoded) - len(encoded) % 4])
+        except binascii.Error:
+            decoded = b''
+        return PayloadFormat('base64', detect_codec(decoded))
+    return PayloadFormat('binary', detect_codec(head))
+
+
+def describe_format(fmt):
+    """Return the decode path for a PayloadFormat, e.g. 'base64 -> zlib -> cfbf'"""
+    steps = [fmt.encoding] if fmt.encoding != 'binary' else []
+    if fmt.codec in CODEC_WBITS:
+        steps.append(fmt.codec)
+    steps.append('cfbf' if fmt.codec is not None else 'unknown')
+    return ' -> '.join(steps)
+
+
+def _no_log(message):
+    pass
+
+
+def decode_edm_payload(payload, instrument=NULL_INSTRUMENTATION, dump_prefix=None, log=_no_log):
+    """Decode and decompress a raw EDM payload in memory
+
+    The format is detected from the payload head (sniff_payload) and the
+    payload is then decoded once with the matching codec. Returns the
+    decompressed bytes (normally a CFBF container) and raises ValueError
+    if the format is not recognised or the payload cannot be decoded.
+    Nothing is written to disk unless dump_prefix is given, in which case
+    the intermediate buffers are saved to <dump_prefix>.decoded and
+    <dump_prefix>.decompressed for inspection. log, if given, receives
+    progress messages (e.g. print), including the decode path taken.
+    """
+    log(f"Read {len(payload)} bytes of encoded data")
+    fmt = sniff_payload(payload)
+    log(f"Detected payload format: {describe_format(fmt)}")
+    if fmt.codec is None:
+        raise ValueError(f"Unrecognised payload format (expected {KNOWN_FORMATS})")
     
-    try:
-        # Read the binary data from the file
-        with open(file_path, 'rb') as f:
-            encoded_data = f.read()
-        
-        print(f"Read {len(encoded_data)} bytes of encoded data")
-        
-        # Check if data is base64 encoded (based on first few characters)
-        if encoded_data.startswith(b'eNr') or all(c in b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=' for c in encoded_data[:100]):
-            print("Data appears to be base64 encoded. Attempting to decode...")
-            try:
-                # Try to decode base64
-                decoded_data = base64.b64decode(encoded_data)
-                print(f"Successfully base64 decoded to {len(decoded_data)} bytes")
-                
-                # Save decoded data for inspection
-                decoded_path = file_path + ".decoded"
-                with open(decoded_path, "wb") as f:
-                    f.write(decoded_data)
-                print(f"Saved decoded data to {decoded_path}")
-                
-                # Proceed with the decoded data
-                compressed_data = decoded_data
-            except binascii.Error as e:
-                print(f"Base64 decoding failed: {e}")
-                print("Proceeding with original data...")
-                compressed_data = encoded_data
-        else:
-            print("Data does not appear to be base64 encoded")
-            compressed_data = encoded_data
+    if fmt.encoding == 'base64':
+        try:
+            with instrument.stage('base64_decode', nbytes=len(payload)):
+                decoded_data = base64.b64decode(payload)
+        except binascii.Error as e:
+            raise ValueError(f"Base64 decoding failed: {e}") from e
+        log(f"Successfully base64 decoded to {len(decoded_data)} bytes")
         
-        # Try to decompress
+        if dump_prefix is not None:
+            # Save decoded data for inspection
+            decoded_path = dump_prefix + ".decoded"
+            with open(decoded_path, "wb") as f:
+                f.write(decoded_data)
+            log(f"Saved decoded data to {decoded_path}")
+    else:
+        decoded_data = payload
+    
+    if fmt.codec == 'cfbf':
+        # Already a container; there is nothing to decompress
+        return bytes(decoded_data)
+    
+    with instrument.stage(f'{fmt.codec}_decompress', nbytes=len(decoded_data)):
         try:
-            decompressed_data = zlib.decompress(compressed_data)
-            print(f"Successfully decompressed with standard zlib to {len(decompressed_data)} bytes")
+            decompressed_data = zlib.decompress(decoded_data, wbits=CODEC_WBITS[fmt.codec])
         except zlib.error as e:
-            print(f"Standard decompression failed: {e}")
-            print("Trying alternative zlib parameters...")
-            
-            # Try with different window bits
-            decompression_succeeded = False
-            for wbits in [15, 31, -15]:  # Standard, gzip, raw deflate
-                try:
-                    decompressed_data = zlib.decompress(compressed_data, wbits=wbits)
-                    print(f"Successfully decompressed with wbits={wbits} to {len(decompressed_data)} bytes")
-                    decompression_succeeded = True
-                    break
-                except zlib.error:
-                    continue
-                    
-            if not decompression_succeeded:
-                print("All decompression attempts failed")
-                return
-        
+            raise ValueError(f"{fmt.codec} decompression failed: {e}") from e
+    log(f"Successfully decompressed {fmt.codec} data to {len(decompressed_data)} bytes")
+    
+    if dump_prefix is not None:
         # Save decompressed data for inspection
-        decompressed_path = file_path + ".decompressed"
+        decompressed_path = dump_prefix + ".decompressed"
         with open(decompressed_path, "wb") as f:
             f.write(decompressed_data)
-        print(f"Saved decompressed data to {decompressed_path}")
+        log(f"Saved decompressed data to {decompressed_path}")
+    return decompressed_data
+
+
+def read_ole_stream(container, stream=CONTENTS_STREAM):
+    """Return the bytes of one stream of a CFBF container held in memory"""
+    # Imported here so base64/zlib-only runs don't pay for it
+    import olefile
+    with olefile.OleFileIO(container) as ole:
+        if not ole.exists(stream):
+            raise FileNotFoundError(f"No {stream} stream in the container")
+        return ole.openstream(stream).read()
+
+
+def parse_edm_payload(payload, as_table=False, instrument=None, progress=None, dump_prefix=None):
+    """Parse a raw EDM payload into a WellCat result without touching the disk
+
+    The payload is decoded, decompressed and opened as a CFBF container in
+    memory, and its Contents stream goes straight to parse_wellcat_buffer.
+    as_table, instrument and progress are passed on to the parser; the
+    extraction reports 'decode' and 'ole_read' through progress first.
+    With dump_prefix, the decoded and decompressed buffers and the Contents
+    stream (<dump_prefix>_streams/Contents) are also saved for debugging.
+    """
+    from wellcat_parser import parse_wellcat_buffer
+    
+    if instrument is None:
+        instrument = NULL_INSTRUMENTATION
+    report = progress or _no_progress
+    
+    report('decode', 0, 1)
+    container = decode_edm_payload(payload, instrument, dump_prefix)
+    
+    report('ole_read', 0, 1)
+    with instrument.stage('ole_read', nbytes=len(container)):
+        contents = read_ole_stream(container)
+    del container
+    
+    if dump_prefix is not None:
+        export_dir = dump_prefix + "_streams"
+        os.makedirs(export_dir, exist_ok=True)
+        with open(os.path.join(export_dir, CONTENTS_STREAM), 'wb') as f:
+            f.write(contents)
+    
+    return parse_wellcat_buffer(contents, as_table=as_table, instrument=instrument, progress=progress)
+
+
+def parse_edm_file(file_path, as_table=False, instrument=None, progress=None, debug=False):
+    """Parse an EDM export file in memory (see parse_edm_payload)
+
+    With debug=True the intermediate buffers are saved next to the file,
+    as analyze_edm_file does.
+    """
+    with open_buffer(file_path) as payload:
+        return parse_edm_payload(payload, as_table=as_table, instrument=instrument, progress=progress,
+                                 dump_prefix=file_path if debug else None)
+
+
+def _no_progress(stage, done, total):
+    pass
+
+
+def _extract_in_memory(file_path, instrument=NULL_INSTRUMENTATION, dump=False):
+    """Decode and decompress the whole payload in memory
+
+    Returns (ole_source, head, size) or None if decompression failed.
+    """
+    # Map the file read-only; the encoded payload is only needed
+    # until it has been decompressed
+    with open_buffer(file_path) as encoded_data:
+        try:
+            decompressed_data = decode_edm_payload(encoded_data, instrument,
+                                                   dump_prefix=file_path if dump else None, log=print)
+        except ValueError as e:
+            print(e)
+            return None
+    
+    return io.BytesIO(decompressed_data), decompressed_data[:512], len(decompressed_data)
+
+
+def _read_chunks(path, chunk_size=CHUNK_SIZE):
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _decode_base64_chunks(chunks):
+    """Incrementally base64 decode an iterable of encoded chunks"""
+    pending = b''
+    for chunk in chunks:
+        pending += chunk.translate(None, NON_BASE64)
+        usable = len(pending) - len(pending) % 4
+        if usable:
+            yield binascii.a2b_base64(pending[:usable])
+            pending = pending[usable:]
+    if pending:
+        # Truncated input raises binascii.Error, same as b64decode
+        yield binascii.a2b_base64(pending)
+
+
+def _tee_chunks(chunks, f):
+    """Pass chunks through while copying them to an open file"""
+    for chunk in chunks:
+        f.write(chunk)
+        yield chunk
+
+
+def _decompress_chunks(chunks, out, wbits, chunk_size=CHUNK_SIZE):
+    """Feed chunks through a zlib.decompressobj, writing at most chunk_size at a time"""
+    decompressor = zlib.decompressobj(wbits=wbits)
+    total = 0
+    for chunk in chunks:
+        while chunk:
+            block = decompressor.decompress(chunk, chunk_size)
+            out.write(block)
+            total += len(block)
+            chunk = decompressor.unconsumed_tail
+    block = decompressor.flush()
+    out.write(block)
+    total += len(block)
+    if not decompressor.eof:
+        raise zlib.error("incomplete or truncated stream")
+    return total
+
+
+def extract_edm_streaming(file_path, chunk_size=CHUNK_SIZE, instrument=NULL_INSTRUMENTATION, dump=False):
+    """Decode and decompress an EDM payload to disk with bounded memory
+
+    The format is detected from the head of the file (sniff_payload), then
+    the payload flows once through an incremental base64 decoder and a
+    zlib.decompressobj in chunks, so memory use does not depend on the
+    payload size. Writes <file_path>.decompressed (only once decoding has
+    succeeded), plus <file_path>.decoded with dump=True.
+
+    Returns (decompressed_path, head, size) or None if decompression failed.
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    
+    fmt = sniff_payload(head)
+    print(f"Detected payload format: {describe_format(fmt)}")
+    if fmt.codec is None:
+        print(f"Unrecognised payload format (expected {KNOWN_FORMATS})")
+        return None
+    
+    chunks = _read_chunks(file_path, chunk_size)
+    if fmt.encoding == 'base64':
+        chunks = _decode_base64_chunks(chunks)
+    
+    decompressed_path = file_path + ".decompressed"
+    # Decode into a temporary file and rename it on success, so a failed
+    # run leaves no partial output behind
+    partial_path = decompressed_path + ".partial"
+    with instrument.stage('stream_extract', nbytes=os.path.getsize(file_path)), \
+            contextlib.ExitStack() as files:
+        if dump and fmt.encoding == 'base64':
+            chunks = _tee_chunks(chunks, files.enter_context(open(file_path + ".decoded", "wb")))
+        size = None
+        try:
+            with open(partial_path, "wb") as out:
+                if fmt.codec == 'cfbf':
+                    # Already a container; copy it through
+                    size = 0
+                    for chunk in chunks:
+                        out.write(chunk)
+                        size += len(chunk)
+                else:
+                    size = _decompress_chunks(chunks, out, CODEC_WBITS[fmt.codec], chunk_size)
+        except binascii.Error as e:
+            print(f"Base64 decoding failed: {e}")
+            return None
+        except zlib.error as e:
+            print(f"{fmt.codec} decompression failed: {e}")
+            return None
+        finally:
+            if size is None:
+                os.remove(partial_path)
+        os.replace(partial_path, decompressed_path)
+    
+    print(f"Successfully decoded to {size} bytes")
+    print(f"Saved decompressed data to {decompressed_path}")
+    with open(decompressed_path, 'rb') as f:
+        return decompressed_path, f.read(512), size
+
+
+def analyze_edm_file(file_path, streaming=False, instrument=None, dump=False):
+    """Decode an EDM payload and export every OLE stream to <file_path>_streams
+
+    With streaming=True the payload is decoded and decompressed chunk by
+    chunk through files on disk instead of being held in memory. The OLE
+    walk itself is not bounded: olefile loads each stream into memory when
+    it is opened, one stream at a time.
+    dump=True also saves the decoded and decompressed payloads next to the
+    file. To parse an export without writing anything, use parse_edm_file.
+    Pass a wellcat_profile.Instrumentation as instrument to record
+    per-stage timings (decode, decompress, OLE walk).
+    Returns the export directory, or None if extraction failed.
+    """
+    if instrument is None:
+        instrument = NULL_INSTRUMENTATION
+    
+    print(f"Analyzing file: {file_path}")
+    
+    try:
+        if streaming:
+            extracted = extract_edm_streaming(file_path, instrument=instrument, dump=dump)
+        else:
+            extracted = _extract_in_memory(file_path, instrument, dump=dump)
+        if extracted is None:
+            return None
+        ole_source, decompressed_head, decompressed_size = extracted
         
         # Check for CFBF signature (D0CF11E0)
-        if decompressed_data[:8] == b'\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1':
+        if decompressed_head.startswith(CFBF_SIGNATURE):
             print("Decompressed data has Microsoft Compound File Binary Format signature")
         else:
             print("Warning: Decompressed data does not have CFBF signature")
         
-        # Create a file-like object from the decompressed data
-        ole_stream = io.BytesIO(decompressed_data)
-        
         # Try to open as an OLE file (using correct class name OleFileIO)
         try:
-            ole = olefile.OleFileIO(ole_stream)
+            # Imported here so base64/zlib-only runs don't pay for it
+            import olefile
+            ole = olefile.OleFileIO(ole_source)
             print("\n===== CFBF File Analysis =====")
             
             # Get and print metadata (updated approach)
@@ -118,6 +418,11 @@ def analyze_edm_file(file_path):
             except Exception as e:
                 print(f"Error extracting metadata: {e}")
             
+            export_dir = file_path + "_streams"
+            if not os.path.exists(export_dir):
+                os.makedirs(export_dir)
+            
+            ole_stage = instrument.start('ole_walk')
             # List all streams (files) in the OLE file
             print("\nFile Structure:")
             for i, stream_path in enumerate(ole.listdir()):
@@ -133,9 +438,11 @@ def analyze_edm_file(file_path):
                     print(f"\n[Stream {i+1}] {path_str}")
                     print(f"  Size: {stream_size} bytes")
                     
-                    # Read the stream data (with a reasonable size limit)
-                    max_read = min(stream_size, 10000)  # Limit to 10KB for large streams
-                    stream_data = ole.openstream(stream_path).read(max_read)
+                    # olefile reads the whole stream into memory when it is
+                    # opened, so open it once for both the preview and the
+                    # export below; peak memory is the largest stream
+                    stream = ole.openstream(stream_path)
+                    stream_data = stream.read(200)
                     
                     # Display a hex dump of the first 100 bytes
                     print(f"  Hex dump (first 100 bytes):")
@@ -159,10 +466,6 @@ def analyze_edm_file(file_path):
                             pass
                     
                     # Export stream to a file for further analysis
-                    export_dir = file_path + "_streams"
-                    if not os.path.exists(export_dir):
-                        os.makedirs(export_dir)
-                    
                     # Create a safe filename
                     if isinstance(stream_path, list) or isinstance(stream_path, tuple):
                         safe_name = '_'.join(stream_path).replace('\\', '_').replace('/', '_')
@@ -176,15 +479,19 @@ def analyze_edm_file(file_path):
                     
                     export_path = os.path.join(export_dir, safe_name)
                     
-                    with open(export_path, 'wb') as f:
-                        f.write(stream_data)
+                    stream.seek(0)
+                    with stream, open(export_path, 'wb') as f:
+                        shutil.copyfileobj(stream, f, CHUNK_SIZE)
+                    ole_stage.add(streams=1, bytes_exported=stream_size)
                     print(f"  Saved to: {export_path}")
                     
                 except Exception as e:
                     print(f"  Error processing stream {path_str}: {e}")
+            instrument.finish(ole_stage)
             
             ole.close()
             print(f"\nComplete analysis saved to directory: {export_dir}")
+            return export_dir
             
         except Exception as e:
             print(f"\nError opening as CFBF: {e}")
@@ -193,7 +500,7 @@ def analyze_edm_file(file_path):
             
             # Basic analysis of the binary data
             print("\nDecompressed Data Analysis:")
-            print(f"  Size: {len(decompressed_data)} bytes")
+            print(f"  Size: {decompressed_size} bytes")
             
             # Check for common file signatures
             signatures = {
@@ -216,7 +523,7 @@ def analyze_edm_file(file_path):
             }
             
             for sig, file_type in signatures.items():
-                if decompressed_data.startswith(sig):
+                if decompressed_head.startswith(sig):
                     print(f"  Detected file type: {file_type}")
                     break
             else:
@@ -224,15 +531,15 @@ def analyze_edm_file(file_path):
             
             # Show hex dump of first part of file
             print("\nHex dump (first 256 bytes):")
-            for i in range(0, min(len(decompressed_data), 256), 16):
-                hex_values = ' '.join(f"{decompressed_data[i+j]:02x}" for j in range(min(16, len(decompressed_data)-i)))
-                ascii_values = ''.join(chr(b) if 32 <= b <= 126 else '.' for b in decompressed_data[i:i+16])
+            for i in range(0, min(len(decompressed_head), 256), 16):
+                hex_values = ' '.join(f"{decompressed_head[i+j]:02x}" for j in range(min(16, len(decompressed_head)-i)))
+                ascii_values = ''.join(chr(b) if 32 <= b <= 126 else '.' for b in decompressed_head[i:i+16])
                 print(f"  {i:04x}: {hex_values:<47} | {ascii_values}")
             
             # Try to interpret as text if it seems like it might be
-            if all(b == 0 or 32 <= b <= 126 or b in (9, 10, 13) for b in decompressed_data[:100]):
+            if all(b == 0 or 32 <= b <= 126 or b in (9, 10, 13) for b in decompressed_head[:100]):
                 try:
-                    text_sample = decompressed_data[:500].decode('utf-8', errors='replace')
+                    text_sample = decompressed_head[:500].decode('utf-8', errors='replace')
                     print("\nSample as text (first 500 chars):")
                     print(text_sample)
                 except Exception:
@@ -240,11 +547,15 @@ def analyze_edm_file(file_path):
     
     except Exception as e:
         print(f"Error analyzing file: {e}")
+    
+    return None
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        file_path = sys.argv[1]
+    # Usage: python analyser.py [file] [--stream] [--dump]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if args:
+        file_path = args[0]
     else:
         file_path = "file.txt"  # Default filename
     
-    analyze_edm_file(file_path)
\ No newline at end of file
+    analyze_edm_file(file_path, streaming='--stream' in sys.argv[1:], dump='--dump' in sys.argv[1:])
\ No newline at end of file
@@ -1,34 +1,30 @@
 import os
 import sys
 import tkinter as tk
-from wellcat_parser import parse_wellcat_data
+from analyser import parse_edm_file
 from wellcat_viewer import WellCatViewer
 
 def main():
-    # Get path to Contents file
+    # Prefer the raw EDM export, which is decoded and parsed in memory;
+    # fall back to a Contents stream extracted by analyser.py
     current_dir = os.path.dirname(os.path.abspath(__file__))
+    payload_file = os.path.join(current_dir, "file.txt")
     contents_file = os.path.join(current_dir, "file.txt_streams", "Contents")
     
-    if not os.path.exists(contents_file):
-        print(f"Error: Could not find file {contents_file}")
+    if os.path.exists(payload_file):
+        source, parse = payload_file, parse_edm_file
+    elif os.path.exists(contents_file):
+        source, parse = contents_file, None
+    else:
+        print(f"Error: Could not find {payload_file} or {contents_file}")
         print(f"Current directory: {current_dir}")
         sys.exit(1)
     
-    # Parse the data
-    print(f"Parsing WellCat data from {contents_file}...")
-    try:
-        parsed_data = parse_wellcat_data(contents_file)
-        print(f"Successfully parsed data with {len(parsed_data.get('pipe_inventory', []))} pipe records")
-    except Exception as e:
-        print(f"Error parsing data: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
-    
-    # Launch the viewer
-    print("Launching WellCat Viewer...")
+    # Launch the viewer right away; it parses in the background and fills
+    # in the tabs as results arrive (unchanged files come from the cache)
+    print(f"Launching WellCat Viewer for {source}...")
     root = tk.Tk()
-    app = WellCatViewer(root, parsed_data)
+    app = WellCatViewer(root, source=source, parse=parse)
     root.mainloop()
 
 if __name__ == "__main__":
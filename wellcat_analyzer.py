@@ -1,12 +1,406 @@
-import struct
 import os
-import collections
-import matplotlib.pyplot as plt
-import numpy as np
+import json
+from wellcat_io import open_buffer
 
-def reverse_engineer_wellcat_format(filepath):
-    with open(filepath, 'rb') as f:
-        data = f.read()
+# NumPy and matplotlib are imported inside the functions that use them, so
+# importing this module (e.g. from the benchmark or the viewer) stays cheap
+
+# Record strides considered by the structure discovery
+MIN_STRIDE = 4
+MAX_STRIDE = 1024
+
+# Bytes per rolling key; a key recurring s bytes later is evidence for stride s
+GRAM_SIZE = 4
+
+# Buffer analyzed per step by find_record_strides, so memory stays bounded
+STRIDE_CHUNK = 4 << 20
+
+# Fraction of bytes that must repeat one stride later inside a record region
+REPEAT_THRESHOLD = 0.25
+
+# A record less similar to the previous one than this fraction of the
+# typical similarity starts a new run (e.g. a longer name shifted it)
+ALIGNED_SIMILARITY = 0.9
+
+# Largest shift tried when re-synchronising after a record of another length
+MAX_SHIFT = 16
+
+# Records compared per step while following a run
+RUN_LOOKAHEAD = 4096
+
+# Records sampled when typing the fields of a layout, and the fraction of
+# them a field type must fit
+FIELD_SAMPLE_ROWS = 4096
+FIELD_MAJORITY = 0.9
+
+# Magnitudes (exclusive) a non-zero float field may take. Doubles get a wide
+# range so null markers such as -880000000.0 still type as float64; stray
+# bytes read as a double almost always have a far larger or smaller exponent.
+FLOAT_RANGES = {'<f8': (1e-9, 1e12), '<f4': (1e-3, 1e6)}
+
+def reverse_engineer_wellcat_format(filepath, layouts_file=None):
+    """Analyze a Contents stream; the record layouts found are saved as JSON
+    to layouts_file (default: <filepath>.layouts.json, next to the input)
+    """
+    if layouts_file is None:
+        layouts_file = filepath + '.layouts.json'
+    with open_buffer(filepath) as data:
+        return _reverse_engineer_buffer(data, layouts_file)
+
+
+def find_strings(data):
+    """Return (offset, text) for every ASCII string of 3+ characters
+
+    A string starts at the first letter of a run of printable bytes (space
+    to '~' plus NUL, tab, CR and LF) and extends to the end of that run.
+    Runs are found with a NumPy mask instead of stepping through the bytes.
+    """
+    import numpy as np
+    arr = np.frombuffer(data, dtype=np.uint8)
+    printable = ((arr >= 32) & (arr <= 126)) | (arr == 0) | (arr == 9) | (arr == 10) | (arr == 13)
+    letters = ((arr >= 65) & (arr <= 90)) | ((arr >= 97) & (arr <= 122))
+    
+    # Start and end of every run of printable bytes
+    edges = np.diff(printable.astype(np.int8), prepend=0, append=0)
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    
+    # First letter at or after each run start, if it is inside the run
+    letter_offsets = np.flatnonzero(letters)
+    if len(letter_offsets) == 0:
+        return []
+    first = letter_offsets[np.minimum(np.searchsorted(letter_offsets, run_starts), len(letter_offsets) - 1)]
+    keep = (first >= run_starts) & (first < run_ends) & (run_ends - first >= 3)
+    
+    return [(start, str(data[start:end], 'ascii', errors='replace'))
+            for start, end in zip(first[keep].tolist(), run_ends[keep].tolist())]
+
+
+def plausible_values(data, dtype, step):
+    """Return (offset, value) for the words at offsets 0, step, 2*step, ...
+    (below len(data) - step) with 0.001 < |value| < 100000
+    """
+    import numpy as np
+    count = len(range(0, len(data) - step, step))
+    if count <= 0:
+        return []
+    # Compare as float64, like struct.unpack followed by Python comparisons;
+    # NaNs (including signalling ones) fail both comparisons
+    with np.errstate(invalid='ignore'):
+        values = np.frombuffer(data, dtype=dtype, count=count).astype(np.float64)
+        magnitude = np.abs(values)
+        indices = np.flatnonzero((magnitude > 0.001) & (magnitude < 100000))
+    return zip((indices * step).tolist(), values[indices].tolist())
+
+
+def repeating_blocks(data, size, limit):
+    """Return the `limit` most common size-byte blocks at multiples of size
+
+    Returns (block, count) pairs ordered like Counter.most_common: by count,
+    then by first occurrence.
+    """
+    import numpy as np
+    count = len(range(0, len(data) - size, size))
+    if count <= 0:
+        return []
+    blocks = np.frombuffer(data, dtype=f'V{size}', count=count)
+    unique, first, counts = np.unique(blocks, return_index=True, return_counts=True)
+    order = np.lexsort((first, -counts))[:limit]
+    return [(unique[i].tobytes(), int(counts[i])) for i in order]
+
+
+def _gram_keys(arr):
+    """Return the GRAM_SIZE-byte key starting at every offset as uint64"""
+    import numpy as np
+    n = len(arr) - GRAM_SIZE + 1
+    keys = arr[:n].astype(np.uint64)
+    for k in range(1, GRAM_SIZE):
+        keys |= arr[k:k + n].astype(np.uint64) << np.uint64(8 * k)
+    return keys
+
+
+def _stride_histogram(arr, max_stride):
+    """Count, per distance, how often a key's next occurrence is that far away"""
+    import numpy as np
+    keys = _gram_keys(arr)
+    # Runs of one byte value (padding, zero fill) repeat at every distance,
+    # and keys that are mostly zero bytes (small integers, flags) recur at
+    # the spacing of whatever array holds them rather than the record size
+    nonzero = sum((((keys >> np.uint64(8 * k)) & np.uint64(0xFF)) != 0).astype(np.int8)
+                  for k in range(GRAM_SIZE))
+    informative = np.flatnonzero((keys != arr[:len(keys)].astype(np.uint64) * np.uint64(0x01010101))
+                                 & (nonzero >= 2))
+    if len(informative) < 2:
+        return np.zeros(max_stride + 1, dtype=np.int64)
+    
+    # One sort on (key, offset) groups equal keys with their offsets ascending
+    combined = np.sort((keys[informative] << np.uint64(32)) | informative.astype(np.uint64))
+    same_key = (combined[1:] >> np.uint64(32)) == (combined[:-1] >> np.uint64(32))
+    offsets = (combined & np.uint64(0xFFFFFFFF)).astype(np.int64)
+    gaps = np.diff(offsets)[same_key]
+    return np.bincount(gaps[gaps <= max_stride], minlength=max_stride + 1)
+
+
+def find_record_strides(data, min_stride=MIN_STRIDE, max_stride=MAX_STRIDE, top=5):
+    """Return up to `top` likely record strides as (stride, score), best first
+
+    Every 4-byte key in the buffer is sorted with its offset, and the distance
+    from each key to its next occurrence is counted. Fixed-size records make
+    most of their keys recur exactly one record later, so the record size
+    dominates that histogram. Keys of constant or mostly-zero bytes are not
+    counted. The score is the fraction of offsets whose key recurs at that
+    distance. Multiples of a better stride are skipped.
+    The buffer is processed in STRIDE_CHUNK pieces (overlapping by
+    max_stride), so time is O(n log n) and memory is bounded.
+    """
+    import numpy as np
+    arr = np.frombuffer(data, dtype=np.uint8)
+    counts = np.zeros(max_stride + 1, dtype=np.int64)
+    for start in range(0, max(1, len(arr) - max_stride), STRIDE_CHUNK):
+        chunk = arr[start:start + STRIDE_CHUNK + max_stride]
+        if len(chunk) > GRAM_SIZE:
+            counts += _stride_histogram(chunk, max_stride)
+    counts[:min_stride] = 0
+    
+    strides = []
+    for stride in np.argsort(-counts, kind='stable').tolist():
+        if counts[stride] == 0 or len(strides) == top:
+            break
+        if any(stride % found == 0 for found, _ in strides):
+            continue
+        strides.append((stride, counts[stride] / len(arr)))
+    return strides
+
+
+def _record_region(arr, stride):
+    """Return (start, count) for the longest run of records repeating at stride"""
+    import numpy as np
+    if len(arr) < 2 * stride:
+        return 0, 0
+    repeats = (arr[:-stride] == arr[stride:]).astype(np.int32)
+    # Fraction of repeating bytes in the stride-long window at each offset
+    window = np.cumsum(np.concatenate(([0], repeats)))
+    dense = (window[stride:] - window[:-stride]) >= REPEAT_THRESHOLD * stride
+    if not dense.any():
+        return 0, 0
+    
+    # Longest run of dense windows
+    edges = np.diff(dense.astype(np.int8), prepend=0, append=0)
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    longest = np.argmax(run_ends - run_starts)
+    first, last = run_starts[longest], run_ends[longest] - 1 + stride
+    
+    # Trim to the first and last bytes that actually repeat
+    hits = np.flatnonzero(repeats[first:last])
+    start = int(first + hits[0])
+    end = int(first + hits[-1]) + stride + 1
+    return start, (end - start) // stride
+
+
+def _resync(arr, last, stride, max_shift):
+    """Return the start of the record after `last`, allowing for a shift
+
+    Each start within max_shift bytes of last + stride is compared with the
+    record at last; the best match wins, preferring no shift on ties. None
+    if nothing matches REPEAT_THRESHOLD of the bytes.
+    """
+    import numpy as np
+    first = max(last + 1, last + stride - max_shift)
+    stop = min(len(arr), last + 2 * stride + max_shift)
+    if stop - first < stride:
+        return None
+    windows = np.lib.stride_tricks.sliding_window_view(arr[first:stop], stride)
+    similarity = (windows == arr[last:last + stride]).mean(axis=1)
+    best = int(np.argmax(similarity))
+    unshifted = last + stride - first
+    if unshifted < len(similarity) and similarity[unshifted] >= similarity[best]:
+        best = unshifted
+    if similarity[best] < REPEAT_THRESHOLD:
+        return None
+    return first + best
+
+
+def _aligned_runs(arr, stride, start, count):
+    """Follow the records of a region as [(start, count)] runs of aligned records
+
+    Records are compared with the previous one; where the similarity drops
+    (a record of another length shifted the rest), the next record start is
+    found again by trying shifts of up to MAX_SHIFT bytes.
+    """
+    import numpy as np
+    rows = arr[start:start + count * stride].reshape(count, stride)
+    pair = (rows[1:] == rows[:-1]).mean(axis=1)
+    threshold = ALIGNED_SIMILARITY * float(np.median(pair))
+    similar = np.flatnonzero(pair >= threshold)
+    if len(similar) == 0:
+        return []
+    max_shift = min(MAX_SHIFT, stride // 4)
+    
+    # Shifts are small, so the walk stays within the region (plus slack)
+    end = min(len(arr), start + (count + 1) * stride + max_shift * count)
+    
+    runs = []
+    run_start = pos = start + int(similar[0]) * stride
+    lookahead = 16
+    while True:
+        n = min(lookahead, (end - pos) // stride)
+        rows = arr[pos:pos + n * stride].reshape(n, stride)
+        low = np.flatnonzero((rows[1:] == rows[:-1]).mean(axis=1) < threshold)
+        for k in low.tolist():
+            # Record k matched its predecessor but not its successor
+            last = pos + k * stride
+            following = _resync(arr[:end], last, stride, max_shift)
+            if following == last + stride:
+                # Unshifted: the record just differs more, so the run goes on
+                continue
+            runs.append((run_start, (last - run_start) // stride + 1))
+            if following is None:
+                return runs
+            run_start = pos = following
+            lookahead = 16
+            break
+        else:
+            if n < 2:
+                runs.append((run_start, (pos - run_start) // stride + 1))
+                return runs
+            pos += (n - 1) * stride
+            # Long runs are compared in growing blocks
+            lookahead = min(2 * lookahead, RUN_LOOKAHEAD)
+
+
+def _plausible_column(rows, offset, size, dtype):
+    """True if the bytes at offset decode to a plausible float in most records"""
+    import numpy as np
+    low, high = FLOAT_RANGES[dtype]
+    with np.errstate(invalid='ignore'):
+        values = rows[:, offset:offset + size].copy().view(dtype).ravel().astype(np.float64)
+        magnitude = np.abs(values)
+        plausible = (magnitude == 0) | ((magnitude > low) & (magnitude < high))
+    return plausible.mean() >= FIELD_MAJORITY and bool((magnitude > 0).any())
+
+
+def describe_record_fields(rows):
+    """Split records (a 2-D uint8 array, one row per record) into typed fields
+
+    Each field is a dict with offset, size, type ('text', 'float64',
+    'float32' or 'bytes') and whether it is constant across records.
+    A type is accepted when it fits FIELD_MAJORITY of the records; at each
+    offset a double is tried before a float, so an 8-byte field is not
+    split into two floats.
+    """
+    stride = rows.shape[1]
+    constant = (rows == rows[0]).all(axis=0)
+    printable = ((rows >= 32) & (rows <= 126)).mean(axis=0) >= FIELD_MAJORITY
+    
+    fields = []
+    offset = 0
+    while offset < stride:
+        # Printable text (names, grade tokens) of two or more bytes
+        end = offset
+        while end < stride and printable[end]:
+            end += 1
+        if end - offset >= 2 and not constant[offset:end].all():
+            kind, size = 'text', end - offset
+        elif offset + 8 <= stride and _plausible_column(rows, offset, 8, '<f8'):
+            kind, size = 'float64', 8
+        elif offset + 4 <= stride and _plausible_column(rows, offset, 4, '<f4'):
+            kind, size = 'float32', 4
+        else:
+            kind, size = 'bytes', 1
+        
+        # Merge neighbouring single bytes into one span
+        if kind == 'bytes' and fields and fields[-1]['type'] == 'bytes' \
+                and fields[-1]['constant'] == bool(constant[offset]):
+            fields[-1]['size'] += 1
+        else:
+            fields.append({'offset': offset, 'size': size, 'type': kind,
+                           'constant': bool(constant[offset:offset + size].all())})
+        offset += size
+    return fields
+
+
+def _typed_fraction(fields, stride):
+    """Fraction of a record's bytes that belong to text or float fields"""
+    return sum(field['size'] for field in fields if field['type'] != 'bytes') / stride
+
+
+def discover_record_layouts(data, min_stride=MIN_STRIDE, max_stride=MAX_STRIDE, top=5):
+    """Return candidate fixed-size record layouts found in the buffer
+
+    Each layout is a dict with the stride, the offset of the first record
+    (start), its alignment relative to the stride (phase), the number of
+    records, the runs of aligned records as [start, count] pairs (records
+    of another length shift the ones after them), the typed fields within
+    a record (see describe_record_fields) and how it ranks:
+    stride_score from find_record_strides, coverage (fraction of the
+    buffer its records span), consistency (fraction of the record bytes
+    that type as text or floats) and score, their product for coverage
+    and consistency. Records of one repeated byte (zero fill, padding) are
+    not counted, and layouts without a varying field are dropped.
+    Layouts are ordered by score.
+    """
+    import numpy as np
+    arr = np.frombuffer(data, dtype=np.uint8)
+    layouts = []
+    for stride, stride_score in find_record_strides(data, min_stride, max_stride, top):
+        start, count = _record_region(arr, stride)
+        runs = _aligned_runs(arr, stride, start, count) if count >= 2 else []
+        
+        # Keep the records that hold data
+        rows = []
+        for run_start, n in runs:
+            block = arr[run_start:run_start + n * stride].reshape(n, stride)
+            rows.append(block[block.min(axis=1) != block.max(axis=1)])
+        rows = np.concatenate(rows) if rows else np.empty((0, stride), dtype=np.uint8)
+        if len(rows) < 2:
+            continue
+        
+        fields = describe_record_fields(rows[:FIELD_SAMPLE_ROWS])
+        if all(field['constant'] for field in fields):
+            continue
+        coverage = len(rows) * stride / len(arr)
+        consistency = _typed_fraction(fields, stride)
+        layouts.append({
+            'stride': stride,
+            'start': runs[0][0],
+            'phase': runs[0][0] % stride,
+            'count': len(rows),
+            'runs': [list(run) for run in runs],
+            'score': round(coverage * consistency, 4),
+            'stride_score': round(float(stride_score), 4),
+            'coverage': round(coverage, 4),
+            'consistency': round(consistency, 4),
+            'fields': fields
+        })
+    layouts.sort(key=lambda layout: -layout['score'])
+    return layouts
+
+
+def _format_layout(layout, data):
+    import numpy as np
+    lines = [f"Stride {layout['stride']} bytes from offset {layout['start']} "
+             f"(phase {layout['phase']}): {layout['count']} records in {len(layout['runs'])} runs, "
+             f"score {layout['score']} (coverage {layout['coverage']}, "
+             f"consistency {layout['consistency']}, stride score {layout['stride_score']})\n"]
+    first = layout['start']
+    for field in layout['fields']:
+        raw = bytes(data[first + field['offset']:first + field['offset'] + field['size']])
+        if field['type'] == 'text':
+            sample = raw.decode('ascii', errors='replace')
+        elif field['type'] == 'float64':
+            sample = np.frombuffer(raw, dtype='<f8')[0].item()
+        elif field['type'] == 'float32':
+            sample = np.frombuffer(raw, dtype='<f4')[0].item()
+        else:
+            sample = raw[:16].hex(' ')
+        state = 'constant' if field['constant'] else 'varies'
+        lines.append(f"  +{field['offset']:<4} {field['type']:<8} {field['size']:>3} bytes  {state:<8}  {sample}\n")
+    return lines
+
+
+def _reverse_engineer_buffer(data, layouts_file=None):
+    import numpy as np
     
     # Create a detailed report file
     with open('wellcat_analysis_report.txt', 'w') as report:
@@ -16,79 +410,55 @@ def reverse_engineer_wellcat_format(filepath):
         
         # 1. Find all text strings
         report.write("TEXT STRINGS:\n")
-        strings = []
-        offset = 0
-        while offset < len(data):
-            # Look for string markers (common patterns like length+string)
-            if data[offset:offset+1].isalpha():
-                # Try to extract a string
-                end = offset
-                while end < len(data) and (32 <= data[end] <= 126 or data[end] in (0, 9, 10, 13)):
-                    end += 1
-                
-                if end - offset >= 3:  # Only record strings of reasonable length
-                    string_data = data[offset:end].decode('ascii', errors='replace')
-                    strings.append((offset, string_data))
-                    report.write(f"Offset {offset}: {string_data}\n")
-                
-                offset = end
-            else:
-                offset += 1
+        strings = find_strings(data)
+        report.writelines(f"Offset {offset}: {string_data}\n" for offset, string_data in strings)
         
         # 2. Find potential numeric fields
         report.write("\nNUMERIC VALUES:\n")
         
-        # Look for 4-byte float values
-        for i in range(0, len(data)-4, 4):
-            try:
-                value = struct.unpack('<f', data[i:i+4])[0]
-                # Keep only reasonable values for well data
-                if 0.001 < abs(value) < 100000 and not float('nan') == value:
-                    report.write(f"Offset {i} - Float32: {value}\n")
-            except:
-                pass
-        
-        # Look for 8-byte double values
-        for i in range(0, len(data)-8, 8):
-            try:
-                value = struct.unpack('<d', data[i:i+8])[0]
-                # Keep only reasonable values for well data
-                if 0.001 < abs(value) < 100000 and not float('nan') == value:
-                    report.write(f"Offset {i} - Double64: {value}\n")
-            except:
-                pass
+        # 4-byte float values, then 8-byte doubles, in reasonable ranges for well data
+        report.writelines(f"Offset {i} - Float32: {value}\n"
+                          for i, value in plausible_values(data, '<f4', 4))
+        report.writelines(f"Offset {i} - Double64: {value}\n"
+                          for i, value in plausible_values(data, '<f8', 8))
         
         # 3. Look for repeating patterns that might indicate records
         pattern_size = 16  # Try various sizes
         report.write(f"\nREPEATING PATTERNS (size {pattern_size}):\n")
-        patterns = collections.Counter()
-        
-        for i in range(0, len(data) - pattern_size, pattern_size):
-            pattern = data[i:i+pattern_size]
-            patterns[pattern] += 1
         
         # Report the most common patterns
-        for pattern, count in patterns.most_common(20):
+        for pattern, count in repeating_blocks(data, pattern_size, 20):
             if count > 2:  # Only patterns that repeat
                 hex_pattern = ' '.join(f'{b:02x}' for b in pattern)
                 report.write(f"Pattern repeated {count} times: {hex_pattern}\n")
         
+        # Fixed-size records at any stride and alignment
+        report.write("\nRECORD LAYOUTS:\n")
+        layouts = discover_record_layouts(data)
+        for layout in layouts:
+            report.writelines(_format_layout(layout, data))
+        
+        # Save the layouts for the parser
+        if layouts_file is not None:
+            with open(layouts_file, 'w') as f:
+                json.dump(layouts, f, indent=2)
+        
         # 4. Visualize data patterns to spot structures
         # Make a grayscale image of the data bytes to visualize patterns
+        # (matplotlib is only needed here, so load it late)
+        from matplotlib.figure import Figure
+        
         width = 512
         height = len(data) // width + 1
         img_data = np.zeros((height, width), dtype=np.uint8)
+        img_data.flat[:len(data)] = np.frombuffer(data, dtype=np.uint8)
         
-        for i in range(len(data)):
-            row = i // width
-            col = i % width
-            if row < height and col < width:
-                img_data[row, col] = data[i]
-        
-        plt.figure(figsize=(12, 8))
-        plt.imshow(img_data, cmap='gray')
-        plt.title('Binary Data Visualization')
-        plt.savefig('data_visualization.png')
+        # A bare Figure renders without pyplot or a GUI backend
+        fig = Figure(figsize=(12, 8))
+        ax = fig.add_subplot(111)
+        ax.imshow(img_data, cmap='gray')
+        ax.set_title('Binary Data Visualization')
+        fig.savefig('data_visualization.png')
     
     print(f"Analysis complete. See wellcat_analysis_report.txt for details")
     
@@ -0,0 +1,163 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from analyser import analyze_edm_file, parse_edm_file
+from wellcat_cache import cached_parse
+from wellcat_parser import parse_wellcat_data
+
+# Files analyze_edm_file writes next to its input; never treat them as inputs
+DERIVED_SUFFIXES = ('.decoded', '.decompressed', '.decompressed.partial')
+
+# Files in flight per worker; bounds how many results are held at once
+PENDING_PER_WORKER = 2
+
+
+def collect_inputs(target, pattern='*'):
+    """Expand a directory or glob into a sorted list of EDM export files"""
+    if os.path.isdir(target):
+        target = os.path.join(target, pattern)
+    paths = []
+    for path in glob.glob(target):
+        if os.path.isfile(path) and not path.endswith(DERIVED_SUFFIXES):
+            paths.append(path)
+    return sorted(paths)
+
+
+def _parse_via_disk(path):
+    """Extract an EDM export to disk in chunks, then parse its Contents stream"""
+    log = io.StringIO()
+    # analyze_edm_file is chatty; keep its output for the error report only
+    with contextlib.redirect_stdout(log):
+        export_dir = analyze_edm_file(path, streaming=True)
+    if export_dir is None:
+        lines = log.getvalue().strip().splitlines()
+        raise ValueError(lines[-1] if lines else "extraction failed")
+
+    contents_file = os.path.join(export_dir, "Contents")
+    if not os.path.exists(contents_file):
+        raise FileNotFoundError(f"No Contents stream in {path}")
+    return parse_wellcat_data(contents_file)
+
+
+def process_file(path, streaming=False, use_cache=False):
+    """Extract and parse a single EDM export
+
+    The export is decoded and parsed in memory (parse_edm_file); with
+    streaming=True it goes through files on disk instead, which bounds
+    memory for very large payloads. use_cache reuses parse results for
+    unchanged exports from the parse cache.
+    Runs inside a worker process. Any failure is caught and returned as an
+    error record so one bad file never takes down the batch.
+    """
+    start = time.perf_counter()
+    try:
+        if streaming:
+            result = _parse_via_disk(path)
+        elif use_cache:
+            result = cached_parse(path, parse=parse_edm_file)
+        else:
+            result = parse_edm_file(path)
+        return {
+            'file': path,
+            'ok': True,
+            'seconds': time.perf_counter() - start,
+            'result': result
+        }
+    except Exception as e:
+        return {
+            'file': path,
+            'ok': False,
+            'seconds': time.perf_counter() - start,
+            'error': f"{type(e).__name__}: {e}"
+        }
+
+
+def batch_parse(paths, output_file, workers=None, streaming=False, use_cache=False, progress_every=100):
+    """Parse many EDM exports across a process pool
+
+    Per-file results are written to output_file as JSON lines as soon as they
+    complete. Only a bounded window of files is submitted at a time and each
+    future is dropped once written, so memory use stays flat regardless of
+    the number of files. Returns a summary dict with counts and throughput.
+    """
+    start = time.perf_counter()
+    succeeded = 0
+    failed = 0
+    done = 0
+    workers = workers or os.cpu_count() or 1
+    queued = iter(paths)
+    pending = set()
+
+    with open(output_file, 'w') as out, ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            # Keep the window full
+            for path in queued:
+                pending.add(executor.submit(process_file, path, streaming, use_cache))
+                if len(pending) >= workers * PENDING_PER_WORKER:
+                    break
+            if not pending:
+                break
+
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                if record['ok']:
+                    succeeded += 1
+                else:
+                    failed += 1
+                    print(f"Failed: {record['file']} ({record['error']})")
+
+                out.write(json.dumps(record) + "\n")
+                done += 1
+
+                if done % progress_every == 0:
+                    elapsed = time.perf_counter() - start
+                    print(f"  {done}/{len(paths)} files, {done / elapsed:.1f} files/s")
+            del finished
+
+    elapsed = time.perf_counter() - start
+    return {
+        'files': len(paths),
+        'succeeded': succeeded,
+        'failed': failed,
+        'seconds': elapsed,
+        'files_per_second': len(paths) / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse many WellCat EDM exports in parallel")
+    parser.add_argument("target", help="Directory of EDM exports or a glob such as 'exports/*.txt'")
+    parser.add_argument("--pattern", default="*", help="File pattern when target is a directory")
+    parser.add_argument("--output", default="wellcat_batch.jsonl", help="Combined JSON lines output")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--stream", action="store_true", help="Use streaming extraction for large payloads")
+    parser.add_argument("--cache", action="store_true", help="Reuse cached results for unchanged files")
+    args = parser.parse_args(argv)
+
+    paths = collect_inputs(args.target, args.pattern)
+    if not paths:
+        print(f"No input files found for {args.target}")
+        return 1
+
+    print(f"Parsing {len(paths)} files...")
+    summary = batch_parse(paths, args.output, workers=args.workers, streaming=args.stream,
+                          use_cache=args.cache)
+
+    print(f"\nProcessed {summary['files']} files in {summary['seconds']:.2f}s "
+          f"({summary['files_per_second']:.1f} files/s)")
+    print(f"  Succeeded: {summary['succeeded']}")
+    print(f"  Failed: {summary['failed']}")
+    print(f"Results written to {args.output}")
+    return 0 if summary['failed'] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
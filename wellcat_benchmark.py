@@ -0,0 +1,408 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from wellcat_export import export_columnar, export_excel_streaming
+from wellcat_io import open_buffer
+from wellcat_parser import export_to_excel, find_packer_information, parse_wellcat_data
+from wellcat_schema import MAX_OD, NULL_VALUE, RATING_FIELDS
+
+SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+DEFAULT_SIZES = '10KB,100KB,1MB,10MB'
+
+# reverse_engineer_wellcat_format writes one report line per value and
+# export_to_excel goes through pandas; keep them off the largest buffers
+# unless asked for explicitly
+DEFAULT_ANALYZER_LIMIT = '1MB'
+DEFAULT_EXCEL_LIMIT = '10MB'
+
+# Stride between grade records in real StressData 3.x Contents streams
+# (length byte, 4-character grade and the 84-byte field block)
+RECORD_STRIDE = 89
+
+SYNTHETIC_GRADES = [b'H-40', b'J-55', b'C-75', b'L-80', b'N-80', b'C-90', b'P-105',
+                    b'L-80X9', b'C-90X9']
+SYNTHETIC_PACKERS = [b'Packer', b'PACKER', b'Plug', b'Seal']
+
+# Common casing ODs (in)
+SYNTHETIC_ODS = [4.5, 5.0, 5.5, 7.0, 7.625, 9.625, 10.75, 13.375, 16.0, 20.0]
+
+# Field block of a synthetic grade record, matching the StressData 3.x schema
+SYNTHETIC_FIELDS = struct.Struct('<di9d')
+
+# Entry points whose import time --startup tracks
+STARTUP_MODULES = ('wellcat_parser', 'analyser', 'wellcat_analyzer', 'wellcat_viewer',
+                   'run_wellcat_analyzer', 'wellcat_batch', 'wellcat_cache', 'wellcat_service')
+
+# Dependencies broken out in the startup report when an entry point pulls them in
+HEAVY_MODULES = ('numpy', 'pandas', 'matplotlib', 'olefile')
+
+
+def parse_size(text):
+    """Parse '10KB', '1.5MB', '2GB' or a plain byte count"""
+    text = text.strip().upper()
+    for unit in ('GB', 'MB', 'KB', 'B'):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * SIZE_UNITS[unit])
+    return int(text)
+
+
+def format_size(size):
+    for unit in ('GB', 'MB', 'KB'):
+        if size >= SIZE_UNITS[unit]:
+            return f"{size / SIZE_UNITS[unit]:.3g}{unit}"
+    return f"{size}B"
+
+
+def _synthetic_header():
+    header = b'\nStressData\x053.087\x00\x00\x00\x00'
+    header += b'\x0fDesign #1 SYNTH' + b'\x00' * 40
+    header += b'\x11Wellbore #1 SYNTH' + b'\x00' * 40
+    return header
+
+
+def _synthetic_record(rng):
+    """One StressData 3.x grade record (see wellcat_schema.RECORD_SCHEMAS)
+
+    The length-prefixed grade token is followed by the 84-byte field block:
+    ID, a flag word, drift, four rating slots, wall tolerance, a reserved
+    slot, OD and weight.
+    """
+    grade = rng.choice(SYNTHETIC_GRADES)
+    od = rng.choice(SYNTHETIC_ODS)
+    wall = round(rng.uniform(0.2, 0.9), 3)
+    weight = round(rng.uniform(30.0, 120.0), 1)
+    ratings = [round(rng.uniform(60.0, 480.0), 1) for _ in range(3)]
+    inner = od - 2 * wall
+
+    record = bytes([len(grade)]) + grade
+    record += SYNTHETIC_FIELDS.pack(inner, 0, inner - 0.125, *ratings, NULL_VALUE,
+                                    87.5, NULL_VALUE, od, weight)
+
+    # Occasionally follow the record with a packer keyword and its depth
+    if rng.random() < 0.02:
+        keyword = rng.choice(SYNTHETIC_PACKERS)
+        record += bytes([len(keyword)]) + keyword + struct.pack('<f', rng.uniform(500.0, 25000.0))
+
+    return record
+
+
+def write_synthetic_contents(path, size, seed=0, chunk_records=4096):
+    """Write a synthetic StressData Contents stream of about `size` bytes
+
+    Records are generated and written in chunks, so multi-GB buffers can be
+    produced without holding them in memory.
+    """
+    rng = random.Random(seed)
+    written = 0
+    with open(path, 'wb') as f:
+        header = _synthetic_header()
+        f.write(header)
+        written += len(header)
+        while written < size:
+            count = min(chunk_records, (size - written) // RECORD_STRIDE + 1)
+            chunk = b''.join(_synthetic_record(rng) for _ in range(count))
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def _measure(func, track_memory):
+    """Run func once and return (seconds, peak traced bytes or None, result)"""
+    if track_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        # Stages print progress messages; keep them out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+    finally:
+        elapsed = time.perf_counter() - start
+        peak = None
+        if track_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def _find_packers(path):
+    with open_buffer(path) as data:
+        return len(find_packer_information(data))
+
+
+def _reverse_engineer(path, workdir):
+    # Imported lazily: the analyzer pulls in matplotlib
+    from wellcat_analyzer import reverse_engineer_wellcat_format
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        return len(reverse_engineer_wellcat_format(path))
+    finally:
+        os.chdir(cwd)
+
+
+def _have_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        return False
+    return True
+
+
+def run_benchmarks(sizes, repeat=1, track_memory=True,
+                   analyzer_limit=parse_size(DEFAULT_ANALYZER_LIMIT),
+                   excel_limit=parse_size(DEFAULT_EXCEL_LIMIT)):
+    """Time each pipeline stage on synthetic buffers of the given sizes
+
+    Returns a list of result dicts with the best wall time of `repeat` runs,
+    throughput in MB/s and the peak traced Python/NumPy allocation.
+    """
+    results = []
+    workdir = tempfile.mkdtemp(prefix='wellcat_bench_')
+    try:
+        for size in sizes:
+            path = os.path.join(workdir, f"Contents_{size}")
+            actual_size = write_synthetic_contents(path, size)
+            parsed = parse_wellcat_data(path)
+            parsed_table = parse_wellcat_data(path, as_table=True)
+
+            cases = [
+                ('parse_wellcat_data', lambda: parse_wellcat_data(path)),
+                ('find_packer_information', lambda: _find_packers(path)),
+            ]
+            if size <= analyzer_limit:
+                cases.append(('reverse_engineer_wellcat_format',
+                              lambda: _reverse_engineer(path, workdir)))
+            if size <= excel_limit:
+                excel_path = os.path.join(workdir, 'bench.xlsx')
+                cases.append(('export_to_excel', lambda: export_to_excel(parsed, excel_path)))
+                cases.append(('export_excel_streaming',
+                              lambda: export_excel_streaming(parsed_table, excel_path)))
+            if _have_pyarrow():
+                parquet_path = os.path.join(workdir, 'bench.parquet')
+                cases.append(('export_columnar', lambda: export_columnar(parsed_table, parquet_path)))
+
+            for name, func in cases:
+                times = []
+                for _ in range(repeat):
+                    elapsed, _, _ = _measure(func, track_memory=False)
+                    times.append(elapsed)
+                peak = _measure(func, track_memory=True)[1] if track_memory else None
+
+                best = min(times)
+                results.append({
+                    'stage': name,
+                    'size': actual_size,
+                    'pipes': len(parsed['pipes']),
+                    'seconds': best,
+                    'mb_per_second': actual_size / SIZE_UNITS['MB'] / best if best > 0 else 0.0,
+                    'peak_bytes': peak
+                })
+            os.remove(path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def _parse_importtime(stderr):
+    """Return {module: cumulative seconds} from python -X importtime output"""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        # Skip the column header line
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        times.setdefault(parts[2].strip(), int(parts[1]) / 1e6)
+    return times
+
+
+def measure_startup(modules=STARTUP_MODULES, repeat=5):
+    """Time `import <module>` in a fresh interpreter for each entry point
+
+    Uses python -X importtime and keeps the fastest of `repeat` runs, along
+    with how much of it went to each of HEAVY_MODULES.
+    """
+    repo = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (repo, env.get('PYTHONPATH')) if p)
+
+    results = []
+    for module in modules:
+        best = None
+        for _ in range(repeat):
+            proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                  cwd=repo, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                break
+            times = _parse_importtime(proc.stderr)
+            if best is None or times[module] < best[module]:
+                best = times
+        if best is None:
+            # e.g. no tkinter on a headless box
+            error = proc.stderr.strip().splitlines()
+            print(f"Skipping {module}: {error[-1] if error else 'import failed'}")
+            continue
+
+        results.append({
+            'stage': f"import {module}",
+            'kind': 'startup',
+            'size': 0,
+            'seconds': best[module],
+            'heavy': {name: best[name] for name in HEAVY_MODULES if name in best}
+        })
+    return results
+
+
+def compare_results(results, baseline, tolerance):
+    """Return the stages that got slower than baseline by more than tolerance
+
+    Parse stages are compared on throughput, startup entries on import time.
+    """
+    previous = {(r['stage'], r['size']): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result['stage'], result['size']))
+        if not before:
+            continue
+        if result.get('kind') == 'startup':
+            slower = result['seconds'] > before['seconds'] * tolerance
+        else:
+            slower = result['mb_per_second'] * tolerance < before['mb_per_second']
+        if slower:
+            regressions.append((result, before))
+    return regressions
+
+
+def _is_measurement(value):
+    # Denormals, infinities and NaN are stray bytes, not measured values
+    return math.isfinite(value) and value >= sys.float_info.min
+
+
+def implausible_pipes(result):
+    """Return the pipes of a parse result whose values could not belong to a pipe
+
+    Only structural checks: a real OD no larger than MAX_OD, a wall between
+    0 and OD / 2, and positive, normal floats for the ratings and weight.
+    """
+    bad = []
+    for pipe in result['pipes']:
+        od = pipe.get('OD')
+        wall = pipe.get('wall_thickness')
+        plausible = (od is not None and wall is not None and _is_measurement(od) and od <= MAX_OD
+                     and 0 < wall < od / 2
+                     and all(_is_measurement(pipe[key]) for key in RATING_FIELDS + ('weight',) if key in pipe))
+        if not plausible:
+            bad.append(pipe)
+    return bad
+
+
+def check_records(path):
+    """Parse a full EDM export and report pipes with implausible values
+
+    Guards the record decoders against keeping tokens that are not pipes;
+    run it on a complete export, not a truncated Contents sample.
+    Returns the number of implausible pipes.
+    """
+    from analyser import parse_edm_file
+    result = parse_edm_file(path)
+    bad = implausible_pipes(result)
+    print(f"{path}: {len(result['pipes'])} pipes, {len(bad)} implausible")
+    for pipe in bad[:10]:
+        print(f"  {pipe['grade']} @ {pipe['offset']}: OD {pipe.get('OD')}, "
+              f"wall {pipe.get('wall_thickness')}, weight {pipe.get('weight')}")
+    return len(bad)
+
+
+def print_startup_results(results):
+    print(f"{'Entry point':<34} {'Import (ms)':>12}  Heavy imports (ms)")
+    for r in results:
+        heavy = ', '.join(f"{name} {seconds * 1000:.0f}" for name, seconds in r['heavy'].items())
+        print(f"{r['stage']:<34} {r['seconds'] * 1000:>12.1f}  {heavy or '-'}")
+
+
+def print_results(results):
+    print(f"{'Stage':<34} {'Size':>8} {'Pipes':>9} {'Time (s)':>10} {'MB/s':>9} {'Peak MB':>9}")
+    for r in results:
+        peak = f"{r['peak_bytes'] / SIZE_UNITS['MB']:.1f}" if r['peak_bytes'] is not None else "-"
+        print(f"{r['stage']:<34} {format_size(r['size']):>8} {r['pipes']:>9} "
+              f"{r['seconds']:>10.4f} {r['mb_per_second']:>9.2f} {peak:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the WellCat parse pipeline")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Comma-separated buffer sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (best is reported)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak-memory pass")
+    parser.add_argument("--analyzer-limit", default=DEFAULT_ANALYZER_LIMIT,
+                        help="Largest size to run reverse_engineer_wellcat_format on")
+    parser.add_argument("--excel-limit", default=DEFAULT_EXCEL_LIMIT,
+                        help="Largest size to run export_to_excel on")
+    parser.add_argument("--startup", action="store_true",
+                        help="Also time python -X importtime for each entry point")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file from a previous --json run")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="Allowed slowdown factor against the baseline")
+    parser.add_argument("--check-records", metavar="EDM_FILE",
+                        help="Fail if parsing this export yields pipes with implausible values")
+    args = parser.parse_args(argv)
+
+    if args.check_records and check_records(args.check_records):
+        return 1
+
+    # --sizes "" skips the parse stages (e.g. with --startup)
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    results = []
+    if sizes:
+        results = run_benchmarks(sizes, repeat=args.repeat, track_memory=not args.no_memory,
+                                 analyzer_limit=parse_size(args.analyzer_limit),
+                                 excel_limit=parse_size(args.excel_limit))
+        print_results(results)
+
+    if args.startup:
+        startup = measure_startup(repeat=args.repeat)
+        if results:
+            print()
+        print_startup_results(startup)
+        results += startup
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for result, before in regressions:
+                if result.get('kind') == 'startup':
+                    print(f"  {result['stage']}: "
+                          f"{before['seconds'] * 1000:.1f} -> {result['seconds'] * 1000:.1f} ms")
+                else:
+                    print(f"  {result['stage']} @ {format_size(result['size'])}: "
+                          f"{before['mb_per_second']:.2f} -> {result['mb_per_second']:.2f} MB/s")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
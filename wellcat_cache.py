@@ -0,0 +1,149 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import zlib
+
+from wellcat_grades import GRADE_CATALOG
+from wellcat_io import open_buffer
+from wellcat_parser import PARSER_VERSION, parse_wellcat_data
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'WELLCAT_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'wellcat'))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+CACHE_SUFFIX = '.wcc'
+
+
+def content_key(data, namespace=''):
+    """Return the SHA-256 key for a buffer of input bytes parsed by this parser version
+
+    The grade catalog's digest is part of the key, so editing
+    wellcat_grades.json invalidates results parsed with the old catalog.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{PARSER_VERSION}:{GRADE_CATALOG.digest}:{namespace}:".encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """On-disk cache of parse results keyed by input content
+
+    Keys are a SHA-256 of the parser version, the grade catalog and the input
+    bytes, so a cache entry is reused only for byte-identical input parsed by
+    the same parser with the same catalog.
+    Entries are stored as zlib-compressed pickles (shared grade_properties
+    dicts are stored once) and the directory is kept under max_bytes by
+    evicting the least recently used entries. Last use is tracked through
+    each entry's modification time.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key_for(self, data, namespace=''):
+        """Return the cache key for a buffer of input bytes"""
+        return content_key(data, namespace)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def get(self, key):
+        """Return the cached result for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                payload = f.read()
+            result = pickle.loads(zlib.decompress(payload))
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Corrupt or incompatible entry; drop it and treat as a miss
+            self._remove(path)
+            return None
+
+        # Mark as recently used; another process may have evicted the entry
+        # since it was read, which still leaves a valid hit
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key, result):
+        """Store a result and evict old entries if the cache is over its size cap"""
+        payload = zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+
+        # Write to a temporary file and rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            self._remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(CACHE_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(CACHE_SUFFIX):
+                self._remove(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def cached_parse(filepath, cache=None, parse=parse_wellcat_data, **parse_kwargs):
+    """Parse a file, reusing a cached result if the file content is unchanged
+
+    parse is called with filepath and parse_kwargs on a miss; its name is
+    part of the key so different parse entry points never share entries.
+    Of the keyword arguments only as_table changes the result and goes into
+    the key; callbacks such as progress are just passed through.
+    """
+    if cache is None:
+        cache = ParseCache()
+
+    namespace = parse.__name__
+    if parse_kwargs.get('as_table'):
+        namespace += ':table'
+
+    with open_buffer(filepath) as data:
+        key = cache.key_for(data, namespace=namespace)
+
+    result = cache.get(key)
+    if result is None:
+        result = parse(filepath, **parse_kwargs)
+        cache.put(key, result)
+    return result
@@ -0,0 +1,340 @@
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+
+from wellcat_parser import PIPE_EXCEL_COLUMNS, parse_wellcat_data
+from wellcat_profile import NULL_INSTRUMENTATION
+
+# Pipe rows converted and written per chunk
+EXPORT_CHUNK_ROWS = 50000
+
+# Schema metadata key for everything that is not a pipe column
+COLUMNAR_METADATA_KEY = b'wellcat'
+
+# Output suffixes written through pyarrow; anything else is Excel
+PARQUET_SUFFIXES = ('.parquet',)
+ARROW_SUFFIXES = ('.arrow', '.feather')
+
+# WellCat binary interchange file: magic, header length, JSON header, records
+BINARY_SUFFIX = '.wcb'
+BINARY_MAGIC = b'WCB1'
+BINARY_PREFIX = struct.Struct('<4sI')
+
+# Records start on a multiple of this many bytes
+BINARY_ALIGN = 64
+
+
+def iter_pipe_rows(pipes, chunk_size=EXPORT_CHUNK_ROWS):
+    """Yield Pipe Inventory sheet rows in lists of up to chunk_size tuples
+
+    Values follow PIPE_EXCEL_COLUMNS and missing ones are None. A PipeTable
+    is converted one column slice at a time, so only a chunk of rows is
+    ever materialized as Python objects.
+    """
+    from wellcat_table import PipeTable
+
+    if isinstance(pipes, PipeTable):
+        for start in range(0, len(pipes), chunk_size):
+            columns = pipes.to_columns(start, start + chunk_size)
+            values = [columns[key].tolist() for key, _ in PIPE_EXCEL_COLUMNS]
+            # NaN (missing) is the only value not equal to itself
+            yield [tuple(v if v == v else None for v in row) for row in zip(*values)]
+        return
+
+    chunk = []
+    for pipe in pipes:
+        props = pipe.get('grade_properties', {})
+        chunk.append(tuple(pipe.get(key, props.get(key)) for key, _ in PIPE_EXCEL_COLUMNS))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_excel_streaming(data, output_file="wellcat_data.xlsx", chunk_size=EXPORT_CHUNK_ROWS,
+                           instrument=None):
+    """Export parsed data to Excel in openpyxl write-only mode
+
+    Writes the same sheets as export_to_excel, but rows go straight to the
+    workbook in chunks instead of through pandas DataFrames, so memory stays
+    bounded for any inventory size.
+    """
+    if instrument is None:
+        instrument = NULL_INSTRUMENTATION
+
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        print("openpyxl module not found. Install with: pip install openpyxl")
+        return False
+
+    try:
+        workbook = Workbook(write_only=True)
+        well_info = data['well_info']
+
+        sheet = workbook.create_sheet('Well Info')
+        sheet.append(['Property', 'Value'])
+        sheet.append(['Version', well_info.get('version', '')])
+        sheet.append(['Well Number', well_info.get('well_number', '')])
+        sheet.append(['Well Name', well_info.get('well_name', '')])
+        sheet.append(['Design Number', well_info.get('design_number', '')])
+        sheet.append(['Design Name', well_info.get('design_name', '')])
+        sheet.append(['Pipe Count', well_info.get('pipe_count', 0)])
+
+        with instrument.stage('excel_stream') as stage:
+            sheet = workbook.create_sheet('Pipe Inventory')
+            sheet.append([header for _, header in PIPE_EXCEL_COLUMNS])
+            for chunk in iter_pipe_rows(data['pipes'], chunk_size):
+                for row in chunk:
+                    sheet.append(row)
+                stage.add(rows=len(chunk))
+
+        sheet = workbook.create_sheet('Grade Properties')
+        sheet.append(['Grade', 'Yield Strength (psi)', 'UTS (psi)', 'Young\'s Modulus (psi)',
+                      'Poisson\'s Ratio'])
+        for grade_name, props in data['grades'].items():
+            sheet.append([grade_name, props.get('yield_strength'), props.get('uts'),
+                          props.get('young_modulus'), props.get('poisson_ratio')])
+
+        sheet = workbook.create_sheet('Grade Distribution')
+        sheet.append(['Grade', 'Count'])
+        for grade, count in well_info.get('grade_distribution', {}).items():
+            sheet.append([grade, count])
+
+        sheet = workbook.create_sheet('Packers')
+        sheet.append(['Type', 'Depth (ft)', 'Plug Depth (ft)'])
+        for packer in data.get('packers') or []:
+            sheet.append([packer.get('type', ''), packer.get('depth', ''), packer.get('plug_depth', '')])
+
+        with instrument.stage('excel_save'):
+            workbook.save(output_file)
+
+        print(f"Data exported to {output_file}")
+        return True
+    except Exception as e:
+        print(f"Error exporting to Excel: {e}")
+        return False
+
+
+def _columnar_schema(pa, data, grade_names):
+    from wellcat_table import PIPE_FLOAT_COLUMNS
+
+    # Grades, well info and packers are small; keep them as JSON metadata so
+    # the file is self-contained and grade properties are stored once
+    metadata = {
+        'well_info': data['well_info'],
+        'grades': data['grades'],
+        'packers': data.get('packers', []),
+        'grade_names': grade_names
+    }
+    fields = [('grade', pa.dictionary(pa.int32(), pa.string())), ('offset', pa.int64())]
+    fields += [(name, pa.float64()) for name in PIPE_FLOAT_COLUMNS]
+    return pa.schema(fields, metadata={COLUMNAR_METADATA_KEY: json.dumps(metadata)})
+
+
+def _pipe_batches(pa, table, schema, chunk_size):
+    import numpy as np
+    from wellcat_table import PIPE_FLOAT_COLUMNS
+
+    grade_dictionary = pa.array(table.grade_names, type=pa.string())
+    for start in range(0, len(table), chunk_size):
+        rows = table.records[start:start + chunk_size]
+        grade = pa.DictionaryArray.from_arrays(
+            pa.array(rows['grade_id'].astype(np.int32)), grade_dictionary)
+        arrays = [grade, pa.array(rows['offset'])]
+        # NaN marks a missing value; store it as null
+        arrays += [pa.array(rows[name], from_pandas=True) for name in PIPE_FLOAT_COLUMNS]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def export_columnar(data, output_file="wellcat_data.parquet", chunk_size=EXPORT_CHUNK_ROWS,
+                    instrument=None):
+    """Export parsed data as Parquet (.parquet) or Arrow IPC (.arrow/.feather)
+
+    Pipes are written as one record batch per chunk with grade as a
+    dictionary-encoded column; grades, well info and packers go in the
+    schema metadata. Read the file back with load_columnar.
+    """
+    if instrument is None:
+        instrument = NULL_INSTRUMENTATION
+
+    try:
+        import pyarrow as pa
+    except ImportError:
+        print("pyarrow module not found. Install with: pip install pyarrow")
+        return False
+
+    from wellcat_table import PipeTable
+
+    try:
+        table = data['pipes']
+        if not isinstance(table, PipeTable):
+            table = PipeTable.from_pipes(table, data['grades'])
+        schema = _columnar_schema(pa, data, table.grade_names)
+
+        if output_file.endswith(PARQUET_SUFFIXES):
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(output_file, schema)
+        else:
+            writer = pa.ipc.new_file(output_file, schema)
+
+        with instrument.stage('columnar_write') as stage, writer:
+            for batch in _pipe_batches(pa, table, schema, chunk_size):
+                writer.write_batch(batch)
+                stage.add(rows=batch.num_rows)
+
+        print(f"Data exported to {output_file}")
+        return True
+    except Exception as e:
+        print(f"Error exporting to {output_file}: {e}")
+        return False
+
+
+def load_columnar(path, memory_map=True):
+    """Load a file written by export_columnar as a parse result
+
+    'pipes' comes back as a PipeTable. With memory_map the file is mapped
+    instead of read, so only the pages the columns touch are loaded.
+    """
+    import numpy as np
+    import pyarrow as pa
+    from wellcat_table import PIPE_DTYPE, PIPE_FLOAT_COLUMNS, PipeTable
+
+    if path.endswith(PARQUET_SUFFIXES):
+        import pyarrow.parquet as pq
+        arrow_table = pq.read_table(path, memory_map=memory_map)
+    else:
+        with (pa.memory_map(path) if memory_map else pa.OSFile(path)) as source:
+            arrow_table = pa.ipc.open_file(source).read_all()
+
+    metadata = json.loads(arrow_table.schema.metadata[COLUMNAR_METADATA_KEY])
+
+    records = np.zeros(arrow_table.num_rows, dtype=PIPE_DTYPE)
+    if arrow_table.num_rows:
+        grade = arrow_table.column('grade').combine_chunks()
+        records['grade_id'] = grade.indices.to_numpy(zero_copy_only=False)
+        records['offset'] = arrow_table.column('offset').to_numpy()
+        for name in PIPE_FLOAT_COLUMNS:
+            records[name] = arrow_table.column(name).to_numpy()
+
+    return {
+        'well_info': metadata['well_info'],
+        'pipes': PipeTable(records, metadata['grade_names'], metadata['grades']),
+        'grades': metadata['grades'],
+        'packers': metadata['packers']
+    }
+
+
+def save_binary(data, output_file="wellcat_data.wcb"):
+    """Save a parse result in the compact WellCat binary format (.wcb)
+
+    The file is a small JSON header (well info, packers, the grade table
+    and the record dtype) followed by the pipe records as raw PIPE_DTYPE
+    rows. Grades are stored once and referenced by grade_id, so nothing is
+    duplicated per pipe. Read it back with load_binary.
+    """
+    from wellcat_table import PIPE_DTYPE, PipeTable
+
+    table = data['pipes']
+    if not isinstance(table, PipeTable):
+        table = PipeTable.from_pipes(table, data['grades'])
+    records = table.records.astype(PIPE_DTYPE, copy=False)
+
+    header = {
+        'count': len(records),
+        'dtype': PIPE_DTYPE.descr,
+        'well_info': data['well_info'],
+        'grades': data['grades'],
+        'grade_names': table.grade_names,
+        'packers': data.get('packers', [])
+    }
+    header_bytes = json.dumps(header, separators=(',', ':')).encode()
+
+    # Pad the header so the records start aligned
+    header_end = BINARY_PREFIX.size + len(header_bytes)
+    header_bytes += b' ' * (-header_end % BINARY_ALIGN)
+
+    with open(output_file, 'wb') as f:
+        f.write(BINARY_PREFIX.pack(BINARY_MAGIC, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(records.tobytes())
+    return output_file
+
+
+def load_binary(path, memory_map=True):
+    """Load a .wcb file written by save_binary as a parse result
+
+    'pipes' is a PipeTable. With memory_map the records are a read-only
+    np.memmap over the file, so opening is instant and only the columns
+    that are used get paged in.
+    """
+    import numpy as np
+    from wellcat_table import PIPE_DTYPE, PipeTable
+
+    with open(path, 'rb') as f:
+        magic, header_length = BINARY_PREFIX.unpack(f.read(BINARY_PREFIX.size))
+        if magic != BINARY_MAGIC:
+            raise ValueError(f"{path} is not a WellCat binary file")
+        header = json.loads(f.read(header_length))
+        offset = BINARY_PREFIX.size + header_length
+
+        dtype = np.dtype([tuple(field) for field in header['dtype']])
+        count = header['count']
+        if memory_map and count:
+            records = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,))
+        else:
+            records = np.fromfile(f, dtype=dtype, count=count)
+
+    if dtype != PIPE_DTYPE:
+        # Written by an older layout; copy the fields both layouts share
+        converted = np.zeros(count, dtype=PIPE_DTYPE)
+        for name in PIPE_DTYPE.names:
+            if name in dtype.names:
+                converted[name] = records[name]
+            elif PIPE_DTYPE[name].kind == 'f':
+                converted[name] = np.nan
+        records = converted
+
+    return {
+        'well_info': header['well_info'],
+        'pipes': PipeTable(records, header['grade_names'], header['grades']),
+        'grades': header['grades'],
+        'packers': header['packers']
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a parsed WellCat Contents stream")
+    parser.add_argument("contents", help="Contents stream to parse")
+    parser.add_argument("output", help="Output file: .wcb, .xlsx, .parquet, .arrow or .feather")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_ROWS,
+                        help=f"Rows written per chunk (default: {EXPORT_CHUNK_ROWS})")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.contents):
+        print(f"File not found: {args.contents}")
+        return 1
+
+    start = time.perf_counter()
+    result = parse_wellcat_data(args.contents, as_table=True)
+    print(f"Parsed {len(result['pipes'])} pipes in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    if args.output.endswith(BINARY_SUFFIX):
+        save_binary(result, args.output)
+        print(f"Data exported to {args.output}")
+        ok = True
+    elif args.output.endswith(PARQUET_SUFFIXES + ARROW_SUFFIXES):
+        ok = export_columnar(result, args.output, chunk_size=args.chunk_size)
+    else:
+        ok = export_excel_streaming(result, args.output, chunk_size=args.chunk_size)
+    print(f"Export took {time.perf_counter() - start:.2f}s")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import re
+from types import MappingProxyType
+
+# Grade catalog shipped next to this module
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wellcat_grades.json')
+
+# Shape of a grade name: one to three letters, a dash and the minimum yield
+# in ksi (H-40, P-110, HCP-110). Yields of 100 ksi and up start with 1, so a
+# digit stored right after a two-digit name is not taken as part of it.
+GRADE_NAME_PATTERN = '[A-Z]{1,3}-(?:1[0-9]{2}|[2-9][0-9])'
+
+
+class GradeCatalog:
+    """Immutable lookup table from grade token to material properties
+
+    grades maps each catalog grade to a read-only mapping of yield_strength,
+    uts, young_modulus and poisson_ratio. resolve() answers for any token:
+    the exact entry, else the entry of its base grade once a variant suffix
+    is removed (L-80X9 -> L-80, P-110HC -> P-110), else the properties for
+    unknown grades. Each distinct token is resolved once and memoized.
+    token_re finds tokens of any grade-like name in a buffer, so grades
+    missing from the catalog are still discovered. digest identifies the
+    catalog contents (parse results depend on it).
+    """
+
+    def __init__(self, grades, standard, variant_suffixes, unknown, digest=''):
+        self.digest = digest
+        self.grades = MappingProxyType(dict(grades))
+        self.standard = tuple(standard)
+        self.unknown = unknown
+        suffix = '(?:' + '|'.join(variant_suffixes) + ')' if variant_suffixes else '(?!)'
+        self.token_re = re.compile(('(?:' + GRADE_NAME_PATTERN + ')' + suffix + '?').encode())
+        self._variant_re = re.compile('(' + GRADE_NAME_PATTERN + ')' + suffix + '$')
+        self._resolved = {}
+
+    def __contains__(self, grade):
+        return grade in self.grades
+
+    def base_grade(self, grade):
+        """Return the grade without its variant suffix (the grade itself if it has none)"""
+        match = self._variant_re.match(grade)
+        return match.group(1) if match else grade
+
+    def resolve(self, grade):
+        """Return the read-only properties for a grade token"""
+        props = self._resolved.get(grade)
+        if props is None:
+            props = self.grades.get(grade)
+            if props is None:
+                props = self.grades.get(self.base_grade(grade), self.unknown)
+            self._resolved[grade] = props
+        return props
+
+    def properties(self, grade):
+        """Return the properties for a grade token as a new dict"""
+        return dict(self.resolve(grade))
+
+
+def load_catalog(path=CATALOG_PATH):
+    """Load a grade catalog from a JSON file (see wellcat_grades.json)"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    spec = json.loads(raw)
+    defaults = spec.get('defaults', {})
+
+    def entry_properties(entry):
+        return MappingProxyType({
+            'yield_strength': entry['yield_strength'],
+            'uts': entry['uts'],
+            'young_modulus': entry.get('young_modulus', defaults.get('young_modulus')),
+            'poisson_ratio': entry.get('poisson_ratio', defaults.get('poisson_ratio'))
+        })
+
+    grades = {name: entry_properties(entry) for name, entry in spec['grades'].items()}
+    return GradeCatalog(grades, spec.get('standard', ()), spec.get('variant_suffixes', ()),
+                        entry_properties(spec['unknown']), hashlib.sha256(raw).hexdigest())
+
+
+# Catalog used by the parser
+GRADE_CATALOG = load_catalog()
@@ -0,0 +1,188 @@
+import numpy as np
+
+from wellcat_io import open_buffer
+from wellcat_parser import (PACKER_WINDOW, RECORD_WINDOW, FloatScanner, decode_grade_records,
+                            dedup_packers, find_packer_candidates, grade_properties,
+                            locate_grade_records, parse_well_info, summarize_pipes)
+
+# Extra bytes around an edit that are rescanned, so tokens straddling the
+# edit boundary are found again
+TOKEN_MARGIN = 16
+
+# Bytes compared per step when looking for the first difference
+COMPARE_BLOCK = 1 << 20
+
+
+def _first_difference(a, b):
+    """Return the index of the first differing byte of two uint8 arrays (or the shorter length)"""
+    n = min(len(a), len(b))
+    for start in range(0, n, COMPARE_BLOCK):
+        stop = min(n, start + COMPARE_BLOCK)
+        diff = np.flatnonzero(a[start:stop] != b[start:stop])
+        if len(diff):
+            return start + int(diff[0])
+    return n
+
+
+def diff_region(old, new):
+    """Return (prefix, suffix): the lengths of the unchanged head and tail of two buffers
+
+    prefix + suffix never exceeds the shorter buffer, so the changed region
+    is old[prefix:len(old) - suffix] -> new[prefix:len(new) - suffix].
+    """
+    a = np.frombuffer(old, dtype=np.uint8)
+    b = np.frombuffer(new, dtype=np.uint8)
+    prefix = _first_difference(a, b)
+    limit = min(len(a), len(b)) - prefix
+    suffix = _first_difference(a[::-1][:limit], b[::-1][:limit])
+    return prefix, suffix
+
+
+def _patch(items, prefix, old_tail, delta, new_size, reach, rescan):
+    """Reuse the items outside an edit and rescan the edited region
+
+    items are tuples starting with a byte offset, sorted by offset, whose
+    content depends on at most `reach` bytes either side of that offset.
+    Items far enough before the edit are kept, items far enough after it are
+    shifted by delta, and rescan(start, end) produces the items between.
+    Returns (items, rescanned count).
+    """
+    start = max(0, prefix - reach)
+    old_end = old_tail + reach
+    new_end = min(new_size, old_end + delta)
+
+    head = [item for item in items if item[0] < start]
+    tail = [(item[0] + delta,) + item[1:] for item in items if item[0] >= old_end]
+    middle = rescan(start, new_end)
+    return head + middle + tail, len(middle)
+
+
+def _decode_records(data, version, scanner, start=0, end=None):
+    """Decode the grade records starting in [start, end) as (offset, grade, values, spec key)
+
+    The spec key is what summarize_pipes deduplicates on, or None for
+    records it would drop (no OD or wall thickness).
+    """
+    records = []
+    # Grade names vary in length, so a token ending just after start may
+    # begin before it. Scan from TOKEN_MARGIN earlier to match tokens as a
+    # full scan does, then drop the ones that start before start.
+    grade_records = [record for record in locate_grade_records(data, max(0, start - TOKEN_MARGIN), end)
+                     if record[0] >= start]
+    for offset, grade, values in decode_grade_records(data, grade_records, version, scanner):
+        spec_key = None
+        if 'OD' in values and 'wall_thickness' in values:
+            spec_key = (grade, round(values['OD'], 3), round(values['wall_thickness'], 3))
+        records.append((offset, grade, values, spec_key))
+    return records
+
+
+class IncrementalParser:
+    """Re-parse successive exports of the same design, re-decoding only what changed
+
+    The first parse() decodes the whole buffer and keeps every grade record
+    and packer hit with its offset. On the next call the new buffer is
+    compared with the previous one to find the edited region (common prefix
+    and suffix). Records whose byte windows lie outside that region are
+    reused, with offsets after the edit shifted by the size change, and
+    only the records in or near the edit are decoded again. The pipe list,
+    packers and grade distribution are then rebuilt from the patched
+    records. Results match parse_wellcat_buffer on the new buffer.
+
+    stats describes the last call: mode ('full', 'incremental' or
+    'unchanged'), changed_bytes, records_decoded and records_reused.
+    """
+
+    def __init__(self, as_table=False):
+        self.as_table = as_table
+        self.data = None
+        # StressData version of self.data; it selects the record decoder
+        self.version = None
+        # (offset, grade, decoded values, spec key) for every grade token
+        self.records = []
+        # (offset, keyword, depth values) for every packer keyword with depths
+        self.packer_hits = []
+        self.result = None
+        self.stats = {}
+
+    def parse_file(self, filepath):
+        with open_buffer(filepath) as data:
+            return self.parse(data)
+
+    def parse(self, data):
+        data = bytes(data)
+        version = parse_well_info(data).get('version')
+        if self.data is None or version != self.version:
+            # Another version may decode every record differently
+            self.version = version
+            self._parse_full(data)
+        elif data == self.data:
+            self.stats = {'mode': 'unchanged', 'changed_bytes': 0,
+                          'records_decoded': 0, 'records_reused': len(self.records)}
+            return self.result
+        else:
+            self._parse_incremental(data)
+
+        self.data = data
+        self.result = self._build_result(data)
+        return self.result
+
+    def _parse_full(self, data):
+        scanner = FloatScanner(data)
+        self.records = _decode_records(data, self.version, scanner)
+        self.packer_hits = find_packer_candidates(data, scanner)
+        self.stats = {'mode': 'full', 'changed_bytes': len(data),
+                      'records_decoded': len(self.records), 'records_reused': 0}
+
+    def _parse_incremental(self, data):
+        prefix, suffix = diff_region(self.data, data)
+        old_tail = len(self.data) - suffix
+        delta = len(data) - len(self.data)
+
+        # Only a few windows are decoded, so skip the whole-buffer masks
+        scanner = FloatScanner(data, cache_masks=False)
+
+        def rescan_records(start, end):
+            return _decode_records(data, self.version, scanner, start, end)
+
+        def rescan_packers(start, end):
+            return find_packer_candidates(data, scanner, start, end)
+
+        self.records, decoded = _patch(self.records, prefix, old_tail, delta, len(data),
+                                       RECORD_WINDOW + TOKEN_MARGIN, rescan_records)
+        self.packer_hits, _ = _patch(self.packer_hits, prefix, old_tail, delta, len(data),
+                                     PACKER_WINDOW + TOKEN_MARGIN, rescan_packers)
+        self.stats = {'mode': 'incremental', 'changed_bytes': len(data) - suffix - prefix,
+                      'records_decoded': decoded, 'records_reused': len(self.records) - decoded}
+
+    def _build_result(self, data):
+        # Same assembly as parse_wellcat_buffer, from the kept records
+        well_info = parse_well_info(data)
+        grades = grade_properties(grade for _, grade, values, _ in self.records if 'OD' in values)
+
+        # summarize_pipes keeps the first record of each spec key; drop the
+        # rest here so pipe dicts are only built for the records it keeps
+        pipe_inventory = []
+        seen_specs = set()
+        for offset, grade, values, spec_key in self.records:
+            if spec_key is None or spec_key in seen_specs:
+                continue
+            seen_specs.add(spec_key)
+            pipe_record = {'grade': grade, 'offset': offset}
+            pipe_record.update(values)
+            pipe_inventory.append(pipe_record)
+
+        unique_pipes, grade_counts = summarize_pipes(pipe_inventory, grades)
+        well_info['pipe_count'] = len(unique_pipes)
+        well_info['grade_distribution'] = grade_counts
+
+        if self.as_table:
+            from wellcat_table import PipeTable
+            unique_pipes = PipeTable.from_pipes(unique_pipes, grades)
+
+        return {
+            'well_info': well_info,
+            'pipes': unique_pipes,
+            'grades': grades,
+            'packers': dedup_packers(self.packer_hits)
+        }
@@ -0,0 +1,32 @@
+import mmap
+from contextlib import contextmanager
+
+
+@contextmanager
+def open_buffer(filepath):
+    """Open a file as a read-only, zero-copy buffer
+
+    The file is memory-mapped and exposed as a memoryview, so slicing it
+    (data[offset:offset+200]) does not copy and large exported archives are
+    never duplicated in RAM. The view is only valid inside the with block;
+    callers must not keep slices or NumPy views of it past that point.
+    """
+    with open(filepath, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            yield memoryview(b'')
+            return
+
+        view = memoryview(mapped)
+        try:
+            yield view
+        finally:
+            try:
+                view.release()
+                mapped.close()
+            except BufferError:
+                # Something still references the buffer (e.g. a NumPy view held
+                # by a traceback); the mapping is freed once that goes away
+                pass
@@ -1,22 +1,181 @@
-import struct
 import re
 import json
 import os
 import numpy as np
+from wellcat_io import open_buffer
+from wellcat_grades import GRADE_CATALOG
+from wellcat_profile import NULL_INSTRUMENTATION
+from wellcat_schema import MIN_TOKEN, decode_records, schema_for_version
 
-def parse_wellcat_data(filepath):
-    """Parse WellCat data into a structured format for oil/gas pipe inventory"""
-    with open(filepath, 'rb') as f:
-        data = f.read()
-    
-    # Create main data structures
-    well_info = {}
-    pipe_inventory = []
-    grades = {}
-    packers = find_packer_information(data)
+# Bump whenever the structure or values of parse results change;
+# it is part of the parse cache key
+PARSER_VERSION = '9'
+
+# Grades always listed in the grade table, found or not
+API_GRADES = GRADE_CATALOG.standard
+
+# Any grade-like name (H-40, P-110, HCP-110) plus an optional variant suffix
+# (L-80X9, P-110HC); see wellcat_grades. finditer yields non-overlapping
+# matches in offset order, so the file is scanned once and every record
+# offset comes out sorted and unique.
+GRADE_TOKEN_RE = GRADE_CATALOG.token_re
+
+# Packer, plug and seal keywords in any case
+PACKER_KEYWORD_RE = re.compile(b'packer|plug|seal', re.IGNORECASE)
+# Packers closer together than this (ft) are treated as the same packer
+PACKER_DEPTH_TOLERANCE = 10
+# Bytes either side of a packer keyword searched for its depths
+PACKER_WINDOW = 100
+
+# Size of the window after a grade token that holds the pipe specs
+RECORD_WINDOW = 200
+
+# Stages reported through the progress callback, in order
+PARSE_STAGES = ('float_views', 'packer_scan', 'header', 'grade_scan', 'float_probe', 'dedup')
+
+# Grade records decoded between progress reports
+PROGRESS_EVERY = 1024
+
+
+class FloatScanner:
+    """Vectorized float32/float64 views of a whole buffer at every byte alignment.
+
+    The buffer is viewed once with np.frombuffer (no copy) at alignments 0-3
+    for floats and 0-7 for doubles. Range filters are evaluated over the full
+    views and cached as boolean masks, so scanning a window of a record is an
+    array slice instead of one struct.unpack per candidate. With
+    cache_masks=False each window is filtered on its own, which is cheaper
+    when only a handful of records will be decoded.
+    """
+
+    def __init__(self, data, cache_masks=True):
+        self.size = len(data)
+        self.cache_masks = cache_masks
+        self.views = {
+            'f': [self._aligned_view(data, '<f4', a) for a in range(4)],
+            'd': [self._aligned_view(data, '<f8', a) for a in range(8)],
+        }
+        self._masks = {}
+
+    @staticmethod
+    def _aligned_view(data, dtype, align):
+        itemsize = np.dtype(dtype).itemsize
+        count = (len(data) - align) // itemsize
+        if count <= 0:
+            return np.empty(0, dtype=dtype)
+        return np.frombuffer(data, dtype=dtype, count=count, offset=align)
 
+    def _mask(self, kind, align, low, high):
+        key = (kind, align, low, high)
+        mask = self._masks.get(key)
+        if mask is None:
+            view = self.views[kind][align]
+            # NaN compares False on both sides, so it never passes the filter
+            mask = (view > low) & (view < high)
+            self._masks[key] = mask
+        return mask
+
+    def values_in_range(self, kind, offset, count, low, high):
+        """Return the values in (low, high) among `count` consecutive words from offset
+
+        kind is 'f' for 4-byte floats or 'd' for 8-byte doubles.
+        """
+        width = 4 if kind == 'f' else 8
+        align = offset % width
+        start = offset // width
+        view = self.views[kind][align][start:start + count]
+        if not self.cache_masks:
+            # Only a few windows will be read; filter just this slice
+            return view[(view > low) & (view < high)]
+        mask = self._mask(kind, align, low, high)[start:start + count]
+        return view[mask]
+
+
+def locate_grade_records(data, start=0, end=None):
+    """Find every grade token in a single pass over the buffer
+
+    Returns a sorted list of (offset, grade) tuples with one entry per
+    record, so each record is decoded exactly once. Variant tokens such as
+    L-80X9 are reported under their full name. Where the token is preceded
+    by a length byte shorter than the match (e.g. 4 before "L-80X9" when
+    "X9" are the first bytes of the next float), it is cut to that length
+    as long as the rest is still a grade. start/end limit the scan to
+    tokens starting in that range.
+    """
+    records = []
+    for match in GRADE_TOKEN_RE.finditer(data, start):
+        offset = match.start()
+        if end is not None and offset >= end:
+            break
+        token = match.group()
+        if offset > 0 and MIN_TOKEN <= data[offset - 1] < len(token):
+            prefixed = token[:data[offset - 1]]
+            if GRADE_TOKEN_RE.fullmatch(prefixed):
+                token = prefixed
+        records.append((offset, token.decode()))
+    return records
+
+
+def decode_pipe_values(scanner, offset, window=RECORD_WINDOW):
+    """Extract OD, wall thickness, weight and ratings for the record at offset"""
+    values = {}
+    length = min(window, scanner.size - offset)
+    # Same word counts as stepping through the window with
+    # range(0, length-8, 4) for floats and range(0, length-8, 8) for doubles
+    n_floats = max(0, (length - 5) // 4)
+    n_doubles = max(0, (length - 1) // 8)
+
+    # Based on the observed patterns in the hex dump and analysis report
+    # OD and wall thickness appear to be in float values
+    plausible = scanner.values_in_range('f', offset, n_floats, 0.01, 100000)
+    if len(plausible) >= 2:
+        # First value in the OD range is usually OD,
+        # the second is usually wall thickness
+        od_candidates = scanner.values_in_range('f', offset, n_floats, 0.5, 30.0)[:2].tolist()
+        if od_candidates:
+            values['OD'] = od_candidates[0]
+        if len(od_candidates) > 1:
+            values['wall_thickness'] = od_candidates[1]
+            # Calculate ID from OD and wall thickness
+            values['ID'] = od_candidates[0] - 2 * od_candidates[1]
+
+    # Rating values are found in double-precision values
+    rating_values = scanner.values_in_range('d', offset, n_doubles, 50, 500)[:3].tolist()
+    for key, val in zip(('burst_rating', 'collapse_rating', 'axial_rating'), rating_values):
+        values[key] = val
+
+    # Weight is typically in a specific range for pipe weight (ppf)
+    weight_vals = scanner.values_in_range('f', offset, n_floats, 30, 200)[:1].tolist()
+    if weight_vals:
+        values['weight'] = weight_vals[0]
+
+    return values
+
+
+def decode_grade_records(data, grade_records, version, scanner, progress=None):
+    """Decode the pipe values of each grade record as (offset, grade, values)
+
+    Versions with a record schema (see wellcat_schema) are decoded in bulk
+    from their fixed layout. Other versions fall back to probing the floats
+    and doubles after each token (decode_pipe_values).
+    """
+    report = progress or _no_progress
+    dtype = schema_for_version(version)
+    if dtype is not None:
+        report('float_probe', 0, len(grade_records))
+        return decode_records(data, grade_records, dtype)
     
-    # Parse basic well info 
+    decoded = []
+    for i, (offset, grade_str) in enumerate(grade_records):
+        if i % PROGRESS_EVERY == 0:
+            report('float_probe', i, len(grade_records))
+        decoded.append((offset, grade_str, decode_pipe_values(scanner, offset)))
+    return decoded
+
+
+def parse_well_info(data):
+    """Read the version, well and design names from the Contents header"""
+    well_info = {}
     version_match = re.search(b'StressData.([0-9.]+)', data[:100])
     if version_match:
         well_info['version'] = version_match.group(1).decode()
@@ -30,146 +189,29 @@ def parse_wellcat_data(filepath):
     if design_match:
         well_info['design_number'] = int(design_match.group(1))
         well_info['design_name'] = design_match.group(2).decode()
-    
-    # Extract grade specs
-    # These are the standard API grades
-    grade_patterns = [b'H-40', b'J-55', b'C-75', b'L-80', b'N-80', b'C-90', b'P-105', 
-                      b'L-80', b'C-90', b'H-40', b'J-55', b'C-75', b'N-80', 
-                      b'L-80', b'C-90', b'L-80', b'C-90', b'P-105', b'H-40', b'J-55',]
-    
-    # First, define grade properties
-    for grade_name in grade_patterns:
-        grade_str = grade_name.decode()
-        
-        # Extract yield and UTS values based on API specifications
-        # These are standard values for API grades
-        if grade_str == 'H-40':
-            yield_strength = 40000  # psi
-            uts = 60000  # psi
-        elif grade_str == 'J-55':
-            yield_strength = 55000
-            uts = 75000
-        elif grade_str == 'C-75':
-            yield_strength = 75000
-            uts = 95000
-        elif grade_str == 'L-80':
-            yield_strength = 80000
-            uts = 95000
-        elif grade_str == 'N-80':
-            yield_strength = 80000
-            uts = 100000
-        elif grade_str == 'C-90':
-            yield_strength = 90000
-            uts = 105000
-        elif grade_str == 'P-105':
-            yield_strength = 105000
-            uts = 120000
-        else:
-            # For special grades, estimate based on the base grade
-            base_grade = grade_str.split('X')[0] if 'X' in grade_str else grade_str.rstrip('k9')
-            if base_grade == 'L-80':
-                yield_strength = 80000
-                uts = 95000
-            elif base_grade == 'C-90':
-                yield_strength = 90000
-                uts = 105000
-            else:
-                yield_strength = 55000  # Default
-                uts = 75000
-        
-        grades[grade_str] = {
-            'yield_strength': yield_strength,
-            'uts': uts,
-            'young_modulus': 30000000,  # psi, standard for steel
-            'poisson_ratio': 0.3        # standard for steel
-        }
-    
-    # Now identify pipe records
-    # Look for patterns where a grade is followed by measurements
-    for grade_name in grade_patterns:
-        grade_str = grade_name.decode()
-        
-        # Find all occurrences of this grade in the file
-        for match in re.finditer(grade_name, data):
-            offset = match.start()
-            
-            # Get the next 100 bytes to analyze for pipe record data
-            record_data = data[offset:offset+200]
-            
-            # Extract pipe specifications
-            pipe_record = {
-                'grade': grade_str,
-                'offset': offset,
-            }
-            
-            # Look for float values that would represent OD, wall thickness, etc.
-            float_values = []
-            for i in range(0, len(record_data)-8, 4):
-                try:
-                    float_val = struct.unpack('<f', record_data[i:i+4])[0]
-                    if 0.01 < float_val < 100000:  # Reasonable range for pipe specs
-                        float_values.append((i, float_val))
-                except:
-                    pass
-            
-            # Also look for doubles
-            double_values = []
-            for i in range(0, len(record_data)-8, 8):
-                try:
-                    double_val = struct.unpack('<d', record_data[i:i+8])[0]
-                    if 0.01 < double_val < 100000:  # Reasonable range
-                        double_values.append((i, double_val))
-                except:
-                    pass
-            
-            # Based on the observed patterns in the hex dump and analysis report
-            # OD and wall thickness appear to be in float values
-            if len(float_values) >= 2:
-                # Likely format based on the file analysis:
-                # First value is usually OD
-                # Second value is usually wall thickness or ID
-                od_val = None
-                wall_thickness = None
-                
-                # Look for values in the right range for OD (inches)
-                for _, val in float_values:
-                    if 0.5 < val < 30.0:  # Typical range for pipe OD in inches
-                        if od_val is None:
-                            od_val = val
-                        elif wall_thickness is None:
-                            wall_thickness = val
-                            break
-                
-                if od_val:
-                    pipe_record['OD'] = od_val
-                
-                if wall_thickness:
-                    pipe_record['wall_thickness'] = wall_thickness
-                    # Calculate ID from OD and wall thickness
-                    if od_val:
-                        pipe_record['ID'] = od_val - 2 * wall_thickness
-            
-            # Rating values are often found in double-precision values
-            # Typically found in the pattern seen in the hex dump
-            rating_values = [val for _, val in double_values if 50 < val < 500]
-            
-            if rating_values:
-                if len(rating_values) >= 1:
-                    pipe_record['burst_rating'] = rating_values[0]
-                if len(rating_values) >= 2:
-                    pipe_record['collapse_rating'] = rating_values[1]
-                if len(rating_values) >= 3:
-                    pipe_record['axial_rating'] = rating_values[2]
-            
-            # Weight is typically in a specific range for pipe weight (ppf)
-            weight_vals = [val for _, val in float_values if 30 < val < 200]
-            if weight_vals:
-                pipe_record['weight'] = weight_vals[0]
-            
-            # Only add if we have at least OD and grade
-            if 'OD' in pipe_record:
-                pipe_inventory.append(pipe_record)
-    
+    return well_info
+
+
+def grade_properties(found_grades):
+    """Return {grade: properties} for the API grades plus any grades found
+
+    Properties come from the grade catalog; variants and grades missing
+    from it resolve through their base grade or the catalog's defaults.
+    """
+    grades = {}
+    for grade_str in API_GRADES:
+        grades[grade_str] = GRADE_CATALOG.properties(grade_str)
+    for grade_str in found_grades:
+        if grade_str not in grades:
+            grades[grade_str] = GRADE_CATALOG.properties(grade_str)
+    return grades
+
+
+def summarize_pipes(pipe_inventory, grades):
+    """Drop duplicate records, attach grade properties and count pipes by grade
+
+    Returns (unique_pipes, grade_counts) with the pipes sorted by grade and OD.
+    """
     # Filter out duplicate records (same grade, OD, and wall thickness)
     unique_pipes = []
     seen_specs = set()
@@ -178,7 +220,7 @@ def parse_wellcat_data(filepath):
         # Create a key from critical specifications
         if 'OD' in pipe and 'wall_thickness' in pipe:
             spec_key = (pipe['grade'], round(pipe['OD'], 3), round(pipe['wall_thickness'], 3))
-            
+    
             if spec_key not in seen_specs:
                 seen_specs.add(spec_key)
                 unique_pipes.append(pipe)
@@ -199,47 +241,172 @@ def parse_wellcat_data(filepath):
             grade_counts[grade] += 1
         else:
             grade_counts[grade] = 1
+    return unique_pipes, grade_counts
+
+
+def parse_wellcat_data(filepath, as_table=False, instrument=None, progress=None):
+    """Parse WellCat data into a structured format for oil/gas pipe inventory
+
+    With as_table=True, 'pipes' is returned as a columnar PipeTable instead
+    of a list of dicts. Pass a wellcat_profile.Instrumentation as instrument
+    to record per-stage timings; they are also returned under 'timings'.
+    progress, if given, is called as progress(stage, done, total) as the
+    parse advances (see PARSE_STAGES); an exception raised from it aborts
+    the parse.
+    """
+    with open_buffer(filepath) as data:
+        return parse_wellcat_buffer(data, as_table=as_table, instrument=instrument, progress=progress)
+
+
+def _no_progress(stage, done, total):
+    pass
+
+
+def parse_wellcat_buffer(data, as_table=False, instrument=None, progress=None):
+    """Parse a WellCat Contents buffer (bytes, mmap or memoryview)"""
+    if instrument is None:
+        instrument = NULL_INSTRUMENTATION
+    report = progress or _no_progress
+    
+    # Create main data structures
+    pipe_inventory = []
+    
+    # The whole buffer is viewed once as float32/float64 arrays and the
+    # range filters are applied as masks, so each record is just a slice.
+    report('float_views', 0, 1)
+    with instrument.stage('float_views', nbytes=len(data)):
+        scanner = FloatScanner(data)
+    
+    report('packer_scan', 0, 1)
+    with instrument.stage('packer_scan', nbytes=len(data)) as stage:
+        packers = find_packer_information(data, scanner)
+        stage.add(packers=len(packers))
+    
+    # Parse basic well info 
+    report('header', 0, 1)
+    with instrument.stage('header'):
+        well_info = parse_well_info(data)
+    
+    # Locate every grade token (including variants like L-80X9) in one pass
+    report('grade_scan', 0, 1)
+    with instrument.stage('grade_scan', nbytes=len(data)) as stage:
+        grade_records = locate_grade_records(data)
+        stage.add(candidates=len(grade_records))
+    
+    # Now identify pipe records
+    # Look for patterns where a grade is followed by measurements
+    with instrument.stage('float_probe') as stage:
+        decoded = decode_grade_records(data, grade_records, well_info.get('version'), scanner, report)
+        for offset, grade_str, values in decoded:
+            # Extract pipe specifications
+            pipe_record = {
+                'grade': grade_str,
+                'offset': offset,
+            }
+            pipe_record.update(values)
+        
+            # Only add if we have at least OD and grade
+            if 'OD' in pipe_record:
+                pipe_inventory.append(pipe_record)
+        stage.add(candidates=len(grade_records), records=len(pipe_inventory))
+    
+    # Define grade properties for the API grades and any variants found in
+    # pipe records; tokens that did not decode to a pipe are not grades
+    grades = grade_properties(grade_str for _, grade_str, values in decoded if 'OD' in values)
+    
+    report('dedup', 0, 1)
+    with instrument.stage('dedup') as stage:
+        unique_pipes, grade_counts = summarize_pipes(pipe_inventory, grades)
+        stage.add(unique=len(unique_pipes))
     
     well_info['pipe_count'] = len(unique_pipes)
     well_info['grade_distribution'] = grade_counts
     
-    return {
+    if as_table:
+        from wellcat_table import PipeTable
+        with instrument.stage('pipe_table'):
+            unique_pipes = PipeTable.from_pipes(unique_pipes, grades)
+    
+    result = {
         'well_info': well_info,
         'pipes': unique_pipes,
         'grades': grades,
         'packers': packers  # Add the packers list
     }
+    if instrument.enabled:
+        result['timings'] = instrument.summary()
+    report('done', 1, 1)
+    return result
 
-def export_to_excel(data, output_file="wellcat_data.xlsx"):
-    """Export parsed data to Excel format"""
+# (pipe field, Excel header) for the Pipe Inventory sheet
+PIPE_EXCEL_COLUMNS = [
+    ('grade', 'Grade'),
+    ('OD', 'OD (in)'),
+    ('wall_thickness', 'Wall Thickness (in)'),
+    ('ID', 'ID (in)'),
+    ('weight', 'Weight (ppf)'),
+    ('burst_rating', 'Burst Rating'),
+    ('collapse_rating', 'Collapse Rating'),
+    ('axial_rating', 'Axial Rating'),
+    ('yield_strength', 'Yield Strength (psi)'),
+    ('uts', 'UTS (psi)'),
+    ('young_modulus', 'Young\'s Modulus (psi)'),
+    ('poisson_ratio', 'Poisson\'s Ratio'),
+]
+
+
+def _pipe_rows(pipes):
+    """Build Pipe Inventory sheet rows from a list of pipe dicts"""
+    pipe_data = []
+    for pipe in pipes:
+        pipe_row = {
+            'Grade': pipe['grade'],
+            'OD (in)': pipe.get('OD'),
+            'Wall Thickness (in)': pipe.get('wall_thickness'),
+            'ID (in)': pipe.get('ID'),
+            'Weight (ppf)': pipe.get('weight'),
+            'Burst Rating': pipe.get('burst_rating'),
+            'Collapse Rating': pipe.get('collapse_rating'),
+            'Axial Rating': pipe.get('axial_rating')
+        }
+        
+        # Add grade properties
+        if 'grade_properties' in pipe:
+            pipe_row['Yield Strength (psi)'] = pipe['grade_properties'].get('yield_strength')
+            pipe_row['UTS (psi)'] = pipe['grade_properties'].get('uts')
+            pipe_row['Young\'s Modulus (psi)'] = pipe['grade_properties'].get('young_modulus')
+            pipe_row['Poisson\'s Ratio'] = pipe['grade_properties'].get('poisson_ratio')
+        
+        pipe_data.append(pipe_row)
+    return pipe_data
+
+
+def export_to_excel(data, output_file="wellcat_data.xlsx", instrument=None, streaming=False):
+    """Export parsed data to Excel format
+
+    With streaming=True rows are written in chunks through openpyxl's
+    write-only mode (see wellcat_export) instead of through pandas.
+    """
+    if streaming:
+        from wellcat_export import export_excel_streaming
+        return export_excel_streaming(data, output_file, instrument=instrument)
+    
+    if instrument is None:
+        instrument = NULL_INSTRUMENTATION
+    
     try:
         import pandas as pd
+        from wellcat_table import PipeTable
         
-        # Create pipe data DataFrame
-        pipe_data = []
-        for pipe in data['pipes']:
-            pipe_row = {
-                'Grade': pipe['grade'],
-                'OD (in)': pipe.get('OD'),
-                'Wall Thickness (in)': pipe.get('wall_thickness'),
-                'ID (in)': pipe.get('ID'),
-                'Weight (ppf)': pipe.get('weight'),
-                'Burst Rating': pipe.get('burst_rating'),
-                'Collapse Rating': pipe.get('collapse_rating'),
-                'Axial Rating': pipe.get('axial_rating')
-            }
-            
-            # Add grade properties
-            if 'grade_properties' in pipe:
-                pipe_row['Yield Strength (psi)'] = pipe['grade_properties'].get('yield_strength')
-                pipe_row['UTS (psi)'] = pipe['grade_properties'].get('uts')
-                pipe_row['Young\'s Modulus (psi)'] = pipe['grade_properties'].get('young_modulus')
-                pipe_row['Poisson\'s Ratio'] = pipe['grade_properties'].get('poisson_ratio')
-            
-            pipe_data.append(pipe_row)
+        frames_stage = instrument.start('excel_frames')
         
-        # Create pipe DataFrame
-        pipe_df = pd.DataFrame(pipe_data)
+        # Create pipe data DataFrame
+        if isinstance(data['pipes'], PipeTable):
+            # Columnar inventory: build the sheet straight from the arrays
+            columns = data['pipes'].to_columns()
+            pipe_df = pd.DataFrame({header: columns[key] for key, header in PIPE_EXCEL_COLUMNS})
+        else:
+            pipe_df = pd.DataFrame(_pipe_rows(data['pipes']))
         
         # Create grade DataFrame
         grade_data = []
@@ -295,13 +462,18 @@ def export_to_excel(data, output_file="wellcat_data.xlsx"):
         else:
             packer_df = pd.DataFrame({'Type': [], 'Depth (ft)': [], 'Plug Depth (ft)': []})
         
+        frames_stage.add(rows=len(pipe_df))
+        instrument.finish(frames_stage)
+        
         # Write to Excel file
-        with pd.ExcelWriter(output_file) as writer:
-            well_df.to_excel(writer, sheet_name='Well Info', index=False)
-            pipe_df.to_excel(writer, sheet_name='Pipe Inventory', index=False)
-            grade_df.to_excel(writer, sheet_name='Grade Properties', index=False)
-            dist_df.to_excel(writer, sheet_name='Grade Distribution', index=False)
-            packer_df.to_excel(writer, sheet_name='Packers', index=False)
+        with instrument.stage('excel_write') as stage:
+            with pd.ExcelWriter(output_file) as writer:
+                well_df.to_excel(writer, sheet_name='Well Info', index=False)
+                pipe_df.to_excel(writer, sheet_name='Pipe Inventory', index=False)
+                grade_df.to_excel(writer, sheet_name='Grade Properties', index=False)
+                dist_df.to_excel(writer, sheet_name='Grade Distribution', index=False)
+                packer_df.to_excel(writer, sheet_name='Packers', index=False)
+            stage.add(rows=len(pipe_df))
         
         print(f"Data exported to {output_file}")
         return True
@@ -312,66 +484,67 @@ def export_to_excel(data, output_file="wellcat_data.xlsx"):
         print(f"Error exporting to Excel: {e}")
         return False
 
-def find_packer_information(data_bytes):
-    """Attempt to find packer-related information in the binary data"""
+def find_packer_candidates(data_bytes, scanner, start=0, end=None):
+    """Return (offset, keyword, depth values) for packer keywords starting in [start, end)
+
+    Only keywords with at least one plausible depth nearby are returned.
+    """
+    candidates = []
+    for match in PACKER_KEYWORD_RE.finditer(data_bytes, start):
+        offset = match.start()
+        if end is not None and offset >= end:
+            break
+        packer_type = match.group().decode()
+        
+        # Analyze the surrounding 200 bytes
+        window_start = max(0, offset - PACKER_WINDOW)
+        length = min(len(data_bytes), offset + PACKER_WINDOW) - window_start
+        
+        # Look for potential depth values (common range for depths in feet: 100-30000),
+        # first as floats then as doubles
+        n_floats = max(0, (length - 1) // 4)
+        n_doubles = max(0, (length - 1) // 8)
+        depth_values = scanner.values_in_range('f', window_start, n_floats, 100, 30000)[:2].tolist()
+        if len(depth_values) < 2:
+            depth_values += scanner.values_in_range('d', window_start, n_doubles, 100, 30000)[:2].tolist()
+        
+        if depth_values:
+            candidates.append((offset, packer_type, depth_values))
+    return candidates
+
+
+def dedup_packers(candidates):
+    """Build packer records from candidates in file order, dropping duplicates"""
     packers = []
+    # depth // PACKER_DEPTH_TOLERANCE -> depths of packers in that bucket
+    depth_index = {}
     
-    # Look for packer-related text
-    packer_keywords = [b'packer', b'Packer', b'PACKER', b'plug', b'Plug', b'PLUG', b'seal', b'Seal', b'SEAL']
-    
-    for keyword in packer_keywords:
-        for match in re.finditer(keyword, data_bytes):
-            offset = match.start()
-            packer_type = keyword.decode()
-            
-            # Extract surrounding 200 bytes to analyze
-            context = data_bytes[max(0, offset-100):min(len(data_bytes), offset+100)]
-            
-            # Look for potential depth values (common range for depths in feet: 100-30000)
-            depth_values = []
-            for i in range(0, len(context)-4, 4):
-                try:
-                    val = struct.unpack('<f', context[i:i+4])[0]
-                    # Filter for reasonable depth values
-                    if 100 < val < 30000:
-                        depth_values.append((i, val))
-                except:
-                    pass
+    for offset, packer_type, depth_values in candidates:
+        # Get the first depth value as the most likely packer depth
+        depth = depth_values[0]
+        
+        # Check if we already have this packer (avoid duplicates).
+        # Anything within tolerance lies in this bucket or a neighbour.
+        bucket = int(depth // PACKER_DEPTH_TOLERANCE)
+        duplicate = any(
+            abs(existing - depth) < PACKER_DEPTH_TOLERANCE
+            for b in (bucket - 1, bucket, bucket + 1)
+            for existing in depth_index.get(b, ())
+        )
+        
+        if not duplicate:
+            depth_index.setdefault(bucket, []).append(depth)
+            packer_record = {
+                'type': packer_type,
+                'depth': depth,
+                'offset': offset
+            }
             
-            # Look for double-precision depth values
-            for i in range(0, len(context)-8, 8):
-                try:
-                    val = struct.unpack('<d', context[i:i+8])[0]
-                    # Filter for reasonable depth values
-                    if 100 < val < 30000:
-                        depth_values.append((i, val))
-                except:
-                    pass
+            # If we have more depth values, second might be plug depth
+            if len(depth_values) > 1:
+                packer_record['plug_depth'] = depth_values[1]
             
-            # If we found depth values, add a packer record
-            if depth_values:
-                # Get the first depth value as the most likely packer depth
-                depth = depth_values[0][1]
-                
-                # Check if we already have this packer (avoid duplicates)
-                duplicate = False
-                for existing in packers:
-                    if abs(existing.get('depth', 0) - depth) < 10:  # Within 10 feet
-                        duplicate = True
-                        break
-                
-                if not duplicate:
-                    packer_record = {
-                        'type': packer_type,
-                        'depth': depth,
-                        'offset': offset
-                    }
-                    
-                    # If we have more depth values, second might be plug depth
-                    if len(depth_values) > 1:
-                        packer_record['plug_depth'] = depth_values[1][1]
-                    
-                    packers.append(packer_record)
+            packers.append(packer_record)
     
     # Sort packers by depth
     packers.sort(key=lambda p: p.get('depth', 0))
@@ -379,15 +552,32 @@ def find_packer_information(data_bytes):
     return packers
 
 
+def find_packer_information(data_bytes, scanner=None):
+    """Attempt to find packer-related information in the binary data
+
+    All keyword variants are found in one case-insensitive pass. Depth
+    candidates come from the vectorized FloatScanner, and duplicates (within
+    10 ft of a packer already found) are detected through a depth index
+    bucketed by 10 ft, so the whole scan is linear in the number of hits.
+    """
+    if scanner is None:
+        scanner = FloatScanner(data_bytes)
+    return dedup_packers(find_packer_candidates(data_bytes, scanner))
+
 if __name__ == "__main__":
     import os
+    import sys
+    from wellcat_profile import Instrumentation
+    
+    # Pass --profile to record per-stage timings
+    instrument = Instrumentation() if '--profile' in sys.argv[1:] else None
     
     current_dir = os.path.dirname(os.path.abspath(__file__))
     contents_file = os.path.join(current_dir, "file.txt_streams", "Contents")
     
     if os.path.exists(contents_file):
         print(f"Analyzing file: {contents_file}")
-        result = parse_wellcat_data(contents_file)
+        result = parse_wellcat_data(contents_file, instrument=instrument)
         
         # Print basic summary
         well_info = result['well_info']
@@ -405,12 +595,25 @@ if __name__ == "__main__":
             for grade, count in well_info['grade_distribution'].items():
                 print(f"  {grade}: {count}")
         
-        # Export to JSON
-        with open('wellcat_data.json', 'w') as f:
-            json.dump(result, f, indent=2)
-        print("\nData exported to wellcat_data.json")
+        # Export in the compact binary format (grades stored once, numeric
+        # columns as raw records); pass --json for a JSON copy as well
+        from wellcat_export import save_binary
+        save_binary(result, 'wellcat_data.wcb')
+        print("\nData exported to wellcat_data.wcb")
+        
+        if '--json' in sys.argv[1:]:
+            with open('wellcat_data.json', 'w') as f:
+                json.dump(result, f, separators=(',', ':'))
+            print("Data exported to wellcat_data.json")
         
         # Try to export to Excel
-        export_to_excel(result)
+        export_to_excel(result, instrument=instrument)
+        
+        if instrument is not None:
+            instrument.export_json('wellcat_profile.json')
+            instrument.export_chrome_trace('wellcat_trace.json')
+            print("\nStage timings written to wellcat_profile.json and wellcat_trace.json")
+            for name, seconds in instrument.totals().items():
+                print(f"  {name}: {seconds * 1000:.2f} ms")
     else:
         print(f"File not found: {contents_file}")
\ No newline at end of file
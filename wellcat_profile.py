@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Stage:
+    """Timing, byte count and candidate counters for one pipeline stage"""
+
+    __slots__ = ('name', 'start', 'seconds', 'bytes', 'counts', 'thread')
+
+    def __init__(self, name, start, nbytes=None):
+        self.name = name
+        self.start = start
+        self.seconds = 0.0
+        self.bytes = nbytes
+        self.counts = {}
+        self.thread = threading.get_ident()
+
+    def add(self, **counts):
+        """Add to this stage's counters (e.g. candidates=120)"""
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def to_dict(self):
+        record = {'stage': self.name, 'seconds': self.seconds}
+        if self.bytes is not None:
+            record['bytes'] = self.bytes
+            if self.seconds > 0:
+                record['mb_per_second'] = self.bytes / (1024 * 1024) / self.seconds
+        record.update(self.counts)
+        return record
+
+
+class Instrumentation:
+    """Opt-in per-stage instrumentation for the parse pipeline
+
+    Pass an instance as `instrument=` to analyze_edm_file, parse_wellcat_data
+    or export_to_excel. Each stage records wall time, bytes processed and any
+    candidate counts. Results are available via summary(), and can be saved
+    as JSON or in Chrome trace format (load in chrome://tracing or Perfetto).
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, nbytes=None):
+        record = self.start(name, nbytes)
+        try:
+            yield record
+        finally:
+            self.finish(record)
+
+    def start(self, name, nbytes=None):
+        """Begin a stage explicitly; pair with finish() where a with block does not fit"""
+        return Stage(name, time.perf_counter(), nbytes)
+
+    def finish(self, record):
+        record.seconds = time.perf_counter() - record.start
+        self.stages.append(record)
+
+    def summary(self):
+        """Return the recorded stages as a list of dicts, in completion order"""
+        return [stage.to_dict() for stage in self.stages]
+
+    def totals(self):
+        """Return {stage name: total seconds} across repeated stages"""
+        totals = {}
+        for stage in self.stages:
+            totals[stage.name] = totals.get(stage.name, 0.0) + stage.seconds
+        return totals
+
+    def to_chrome_trace(self):
+        """Return the stages as a Chrome trace event dict"""
+        pid = os.getpid()
+        events = []
+        for stage in self.stages:
+            args = dict(stage.counts)
+            if stage.bytes is not None:
+                args['bytes'] = stage.bytes
+            events.append({
+                'name': stage.name,
+                'ph': 'X',
+                'ts': (stage.start - self.origin) * 1e6,
+                'dur': stage.seconds * 1e6,
+                'pid': pid,
+                'tid': stage.thread,
+                'args': args
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def add(self, **counts):
+        pass
+
+
+class NullInstrumentation:
+    """Stand-in used when instrumentation is off; every stage is a no-op"""
+
+    enabled = False
+    _stage = _NullStage()
+
+    @contextmanager
+    def stage(self, name, nbytes=None):
+        yield self._stage
+
+    def start(self, name, nbytes=None):
+        return self._stage
+
+    def finish(self, record):
+        pass
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
@@ -0,0 +1,141 @@
+import numpy as np
+
+# Value the exporter writes into numeric fields that are not set
+NULL_VALUE = -880000000.0
+
+# Grade record layouts, keyed by StressData version (or major version).
+# A grade record is the grade token preceded by its length byte and followed
+# by a fixed block of fields; offsets are relative to the end of the token.
+# Fields starting with an underscore are part of the layout but not reported.
+RECORD_SCHEMAS = {
+    '3': {
+        'size': 84,
+        'fields': (
+            ('ID', 0, '<f8'),
+            ('_flags', 8, '<i4'),
+            ('_drift', 12, '<f8'),
+            ('burst_rating', 20, '<f8'),
+            ('collapse_rating', 28, '<f8'),
+            ('axial_rating', 36, '<f8'),
+            ('_rating_4', 44, '<f8'),
+            ('_wall_tolerance', 52, '<f8'),  # percent of nominal wall (87.5 for API)
+            ('_reserved', 60, '<f8'),
+            ('OD', 68, '<f8'),
+            ('weight', 76, '<f8'),
+        ),
+    },
+}
+
+# Shortest and longest grade token accepted through the length byte
+MIN_TOKEN = 4
+MAX_TOKEN = 16
+
+# Records gathered and decoded per step, so the temporary arrays stay small
+DECODE_CHUNK = 65536
+
+RATING_FIELDS = ('burst_rating', 'collapse_rating', 'axial_rating')
+
+# Largest OD (in) a record may have; a sanity bound against tokens that are
+# not records, wide enough for conductor and line pipe
+MAX_OD = 60.0
+
+
+def _compile(schema):
+    """Build the NumPy structured dtype for one record layout"""
+    names, offsets, formats = zip(*schema['fields'])
+    return np.dtype({'names': list(names), 'offsets': list(offsets),
+                     'formats': list(formats), 'itemsize': schema['size']})
+
+
+RECORD_DTYPES = {version: _compile(schema) for version, schema in RECORD_SCHEMAS.items()}
+
+
+def schema_for_version(version):
+    """Return the record dtype for a StressData version like '3.087', or None
+
+    An exact entry wins over the major version.
+    """
+    if not version:
+        return None
+    dtype = RECORD_DTYPES.get(version)
+    if dtype is None:
+        dtype = RECORD_DTYPES.get(version.split('.')[0])
+    return dtype
+
+
+def _present(column):
+    """Flag the values of a field that are set (finite and not the null marker)"""
+    with np.errstate(invalid='ignore'):
+        return np.isfinite(column) & (column != NULL_VALUE)
+
+
+def _column(fields, name):
+    """Return a field as a list plus a list of flags for the values that are set"""
+    column = fields[name]
+    return column.tolist(), _present(column).tolist()
+
+
+def decode_records(data, grade_records, dtype):
+    """Decode grade records in bulk with a record dtype from schema_for_version
+
+    grade_records are (offset, grade) pairs from locate_grade_records.
+    Returns (offset, grade, values) for each token that starts a record:
+    the grade is read through the length byte (so a token followed by
+    unrelated letters is cut to its real length), and values holds OD,
+    wall_thickness, ID, and the ratings and weight where they are set.
+    Records are checked structurally only: tokens without a valid length
+    byte, whose record runs past the end of the buffer, without a set OD
+    and ID, or whose geometry is impossible (OD over MAX_OD, wall not
+    between 0 and OD / 2) are not records and are skipped.
+    """
+    if not grade_records:
+        return []
+    arr = np.frombuffer(data, dtype=np.uint8)
+    offsets = np.fromiter((offset for offset, _ in grade_records), dtype=np.int64,
+                          count=len(grade_records))
+
+    lengths = np.zeros(len(offsets), dtype=np.int64)
+    has_prefix = offsets > 0
+    lengths[has_prefix] = arr[offsets[has_prefix] - 1]
+    starts = offsets + lengths
+    valid = has_prefix & (lengths >= MIN_TOKEN) & (lengths <= MAX_TOKEN) & (starts + dtype.itemsize <= len(arr))
+
+    decoded = []
+    token_lengths = lengths.tolist()
+    field_range = np.arange(dtype.itemsize)
+    for chunk in range(0, len(offsets), DECODE_CHUNK):
+        rows = np.flatnonzero(valid[chunk:chunk + DECODE_CHUNK]) + chunk
+        if len(rows) == 0:
+            continue
+        # Gather each record's bytes into one contiguous block and view it
+        # through the schema dtype
+        block = arr[starts[rows][:, None] + field_range]
+        fields = block.view(dtype).ravel()
+
+        # Keep only records that describe a pipe
+        with np.errstate(invalid='ignore', over='ignore'):
+            wall = (fields['OD'] - fields['ID']) / 2
+            is_pipe = (_present(fields['OD']) & _present(fields['ID']) & (fields['OD'] <= MAX_OD)
+                       & (wall > 0) & (wall < fields['OD'] / 2))
+        rows = rows[is_pipe]
+        fields = fields[is_pipe]
+
+        od = fields['OD'].tolist()
+        inner = fields['ID'].tolist()
+        weight, weight_set = _column(fields, 'weight')
+        ratings = [(key,) + _column(fields, key) for key in RATING_FIELDS]
+
+        for i, row in enumerate(rows.tolist()):
+            offset, grade = grade_records[row]
+            if token_lengths[row] != len(grade):
+                grade = str(data[offset:offset + token_lengths[row]], 'ascii', errors='replace')
+
+            # Same keys, in the same order, as the heuristic decoder
+            values = {'OD': od[i], 'wall_thickness': (od[i] - inner[i]) / 2, 'ID': inner[i]}
+            for key, column, present in ratings:
+                if present[i]:
+                    values[key] = column[i]
+            if weight_set[i]:
+                values['weight'] = weight[i]
+            decoded.append((offset, grade, values))
+    return decoded
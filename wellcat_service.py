@@ -0,0 +1,490 @@
+import argparse
+import asyncio
+import collections
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from wellcat_cache import DEFAULT_CACHE_DIR, ParseCache, content_key
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Requests handed to one worker call, and how long the first request of a
+# batch waits for others to join it
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_BATCH_WINDOW = 0.005  # seconds
+
+# Largest request body accepted
+MAX_BODY_BYTES = 256 * 1024 * 1024  # 256 MB
+
+# Recent requests the latency percentiles are computed over
+LATENCY_WINDOW = 10000
+
+# What a request body holds (?kind=...) -> the parse entry point that
+# cached_parse keys the same input under, so CLI and service share entries
+PAYLOAD_KINDS = {
+    'edm': 'parse_edm_file',         # raw EDM export (base64 / compressed CFBF)
+    'contents': 'parse_wellcat_data'  # extracted Contents stream
+}
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 422: 'Unprocessable Entity', 500: 'Internal Server Error'}
+
+
+class ServiceError(Exception):
+    """A request failure reported to the client with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_payload(kind, payload):
+    if kind == 'edm':
+        from analyser import parse_edm_payload
+        return parse_edm_payload(payload)
+    from wellcat_parser import parse_wellcat_buffer
+    return parse_wellcat_buffer(payload)
+
+
+def parse_batch(jobs, cache_dir=None):
+    """Parse a batch of (key, kind, payload) jobs inside a worker process
+
+    Each result is stored in the parse cache under key (when cache_dir is
+    set) and returned already JSON-encoded, so only bytes travel back to the
+    front end. Returns one (ok, body) pair per job; a failed job gives its
+    error message instead of failing the batch.
+    """
+    cache = ParseCache(cache_dir) if cache_dir else None
+    results = []
+    for key, kind, payload in jobs:
+        try:
+            result = _parse_payload(kind, payload)
+            if cache is not None:
+                cache.put(key, result)
+            results.append((True, json.dumps(result).encode()))
+        except Exception as e:
+            results.append((False, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def _percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+class ServiceMetrics:
+    """Request counters, latency percentiles and throughput for the service"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.dedup_hits = 0
+        self.parsed = 0
+        self.batches = 0
+
+    def record(self, seconds, ok):
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.latencies.append(seconds)
+
+    def snapshot(self):
+        ordered = sorted(self.latencies)
+        uptime = time.perf_counter() - self.started
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'cache_hits': self.cache_hits,
+            'dedup_hits': self.dedup_hits,
+            'parsed': self.parsed,
+            'batches': self.batches,
+            'mean_batch_size': self.parsed / self.batches if self.batches else 0.0,
+            'latency_p50_ms': _percentile(ordered, 50) * 1000,
+            'latency_p99_ms': _percentile(ordered, 99) * 1000,
+            'uptime_seconds': uptime,
+            'requests_per_second': self.requests / uptime if uptime > 0 else 0.0
+        }
+
+
+class ParseService:
+    """Local HTTP/JSON front end over a process pool of parsers
+
+    POST /parse with a raw EDM export as the body (or ?kind=contents with
+    an extracted Contents stream) returns the parse result as JSON.
+    GET /metrics returns ServiceMetrics.snapshot() and GET /health 'ok'.
+
+    Requests are keyed by content hash (the ParseCache key). A payload that
+    is already being parsed waits for that parse instead of starting
+    another, and cached results are answered without reaching a worker.
+    Misses are queued and grouped into batches of up to batch_size, which
+    gather for at most batch_window seconds; at most one batch per worker
+    is outstanding, so requests arriving while the pool is busy join the
+    next batch rather than queueing one call each.
+    """
+
+    def __init__(self, workers=None, batch_size=DEFAULT_BATCH_SIZE, batch_window=DEFAULT_BATCH_WINDOW,
+                 cache_dir=DEFAULT_CACHE_DIR):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.cache_dir = cache_dir
+        self.cache = ParseCache(cache_dir) if cache_dir else None
+        self.metrics = ServiceMetrics()
+        self._pool = None
+        self._queue = None
+        self._slots = None
+        self._inflight = {}
+        self._tasks = set()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+        """Run the service until cancelled; ready(port) is called once it listens"""
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        batcher = asyncio.ensure_future(self._batcher())
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        try:
+            port = server.sockets[0].getsockname()[1]
+            print(f"WellCat parse service on http://{host}:{port} "
+                  f"({self.workers} workers, batches of {self.batch_size})")
+            if ready is not None:
+                ready(port)
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _spawn(self, coro):
+        # Keep a reference so pending tasks are not garbage collected
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ServiceError as e:
+                    await _write_response(writer, e.status, _error_body(e), keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+
+                start = time.perf_counter()
+                try:
+                    status, response = 200, await self._dispatch(method, target, body)
+                except ServiceError as e:
+                    status, response = e.status, _error_body(e)
+                except Exception as e:
+                    status, response = 500, _error_body(f"{type(e).__name__}: {e}")
+                if urlsplit(target).path == '/parse':
+                    self.metrics.record(time.perf_counter() - start, status == 200)
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await _write_response(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == '/parse':
+            if method != 'POST':
+                raise ServiceError(405, "Use POST to submit a payload")
+            kind = parse_qs(url.query).get('kind', ['edm'])[0]
+            if kind not in PAYLOAD_KINDS:
+                raise ServiceError(400, f"Unknown kind {kind!r} (expected one of {', '.join(PAYLOAD_KINDS)})")
+            if not body:
+                raise ServiceError(400, "Empty payload")
+            return await self.parse(body, kind)
+        if method != 'GET':
+            raise ServiceError(405, f"Use GET for {url.path}")
+        if url.path == '/metrics':
+            return json.dumps(self.metrics.snapshot()).encode()
+        if url.path == '/health':
+            return b'"ok"'
+        raise ServiceError(404, f"No such endpoint: {url.path}")
+
+    async def parse(self, payload, kind='edm'):
+        """Return the JSON-encoded parse result for a payload"""
+        loop = asyncio.get_running_loop()
+        # Hashing large payloads would stall the event loop
+        key = await loop.run_in_executor(None, content_key, payload, PAYLOAD_KINDS[kind])
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._spawn(self._resolve(key, kind, payload))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.metrics.dedup_hits += 1
+        # A client that disconnects must not cancel the parse others wait on
+        return await asyncio.shield(task)
+
+    async def _resolve(self, key, kind, payload):
+        loop = asyncio.get_running_loop()
+        if self.cache is not None:
+            result = await loop.run_in_executor(None, self.cache.get, key)
+            if result is not None:
+                self.metrics.cache_hits += 1
+                return await loop.run_in_executor(None, _encode, result)
+
+        future = loop.create_future()
+        await self._queue.put((key, kind, payload, future))
+        ok, body = await future
+        if not ok:
+            raise ServiceError(422, body)
+        return body
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for a free worker first; requests arriving meanwhile
+            # collect in the queue and go out together
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._spawn(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        jobs = [(key, kind, payload) for key, kind, payload, _ in batch]
+        try:
+            results = await loop.run_in_executor(self._pool, parse_batch, jobs, self.cache_dir)
+        except Exception as e:
+            results = [(False, f"Worker failed: {type(e).__name__}: {e}")] * len(batch)
+        finally:
+            self._slots.release()
+
+        self.metrics.batches += 1
+        self.metrics.parsed += len(batch)
+        for (_, _, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def _encode(result):
+    return json.dumps(result).encode()
+
+
+def _error_body(error):
+    return json.dumps({'error': str(error)}).encode()
+
+
+async def _read_request(reader):
+    """Read one HTTP/1.1 request as (method, target, headers, body), or None at end of stream"""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise ServiceError(400, "Incomplete request")
+        return None
+    except asyncio.LimitOverrunError:
+        raise ServiceError(400, "Request headers too large")
+
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, _ = lines[0].split(' ', 2)
+    except ValueError:
+        raise ServiceError(400, "Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise ServiceError(400, "Chunked bodies are not supported; send Content-Length")
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise ServiceError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise ServiceError(413, f"Payload over {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target, headers, body
+
+
+async def _write_response(writer, status, body, keep_alive):
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode('latin-1'))
+    writer.write(body)
+    await writer.drain()
+
+
+class ServiceClient:
+    """Blocking client for a running parse service (one connection, reused)"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=600):
+        self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _request(self, method, path, body=None):
+        self.connection.request(method, path, body=body)
+        response = self.connection.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"{response.status}: {data.get('error')}")
+        return data
+
+    def parse(self, payload, kind='edm'):
+        """Parse payload bytes on the service and return the result dict"""
+        return self._request('POST', f'/parse?kind={kind}', bytes(payload))
+
+    def parse_file(self, path, kind='edm'):
+        with open(path, 'rb') as f:
+            return self.parse(f.read(), kind)
+
+    def metrics(self):
+        return self._request('GET', '/metrics')
+
+    def close(self):
+        self.connection.close()
+
+
+def run_load(payloads, host=DEFAULT_HOST, port=DEFAULT_PORT, requests=100, concurrency=8, kind='edm'):
+    """Send requests (cycling through payloads) from concurrency client threads
+
+    Returns client-side counts, p50/p99 latency and throughput.
+    """
+    latencies = []
+    errors = []
+    counter = iter(range(requests))
+    lock = threading.Lock()
+
+    def client_loop():
+        client = ServiceClient(host, port)
+        try:
+            while True:
+                with lock:
+                    index = next(counter, None)
+                if index is None:
+                    break
+                start = time.perf_counter()
+                try:
+                    client.parse(payloads[index % len(payloads)], kind)
+                except Exception as e:
+                    errors.append(str(e))
+                    client.close()
+                    client = ServiceClient(host, port)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(client_loop) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'latency_p50_ms': _percentile(ordered, 50) * 1000,
+        'latency_p99_ms': _percentile(ordered, 99) * 1000
+    }
+
+
+def _print_metrics(title, metrics):
+    print(title)
+    for key, value in metrics.items():
+        print(f"  {key}: {value:.2f}" if isinstance(value, float) else f"  {key}: {value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON service for WellCat parses")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the service")
+    serve.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on (default: localhost only)")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    serve.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    serve.add_argument("--batch-window", type=float, default=DEFAULT_BATCH_WINDOW * 1000,
+                       help="Milliseconds a batch waits to fill")
+    serve.add_argument("--no-cache", action="store_true", help="Do not read or write the parse cache")
+
+    for name, help_text in (("parse", "Parse files through a running service"),
+                            ("bench", "Load-test a running service")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("files", nargs="+", help="EDM exports (or Contents streams with --contents)")
+        command.add_argument("--host", default=DEFAULT_HOST)
+        command.add_argument("--port", type=int, default=DEFAULT_PORT)
+        command.add_argument("--contents", action="store_true", help="Files are extracted Contents streams")
+    bench = commands.choices["bench"]
+    bench.add_argument("--requests", type=int, default=100)
+    bench.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        service = ParseService(workers=args.workers, batch_size=args.batch_size,
+                               batch_window=args.batch_window / 1000,
+                               cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR)
+        try:
+            asyncio.run(service.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    kind = 'contents' if args.contents else 'edm'
+    if args.command == "parse":
+        client = ServiceClient(args.host, args.port)
+        failed = 0
+        for path in args.files:
+            try:
+                result = client.parse_file(path, kind)
+                print(f"{path}: {len(result['pipes'])} pipes, {len(result['packers'])} packers")
+            except Exception as e:
+                failed += 1
+                print(f"{path}: failed ({e})")
+        client.close()
+        return 0 if failed == 0 else 2
+
+    payloads = []
+    for path in args.files:
+        with open(path, 'rb') as f:
+            payloads.append(f.read())
+    report = run_load(payloads, args.host, args.port, requests=args.requests,
+                      concurrency=args.concurrency, kind=kind)
+    _print_metrics("Client:", report)
+    _print_metrics("Service:", ServiceClient(args.host, args.port).metrics())
+    return 0 if report['errors'] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
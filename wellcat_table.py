@@ -0,0 +1,294 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+# Numeric pipe fields, in the order they appear in pipe dicts
+PIPE_FLOAT_COLUMNS = ('OD', 'wall_thickness', 'ID',
+                      'burst_rating', 'collapse_rating', 'axial_rating', 'weight')
+
+GRADE_PROPERTY_KEYS = ('yield_strength', 'uts', 'young_modulus', 'poisson_ratio')
+
+PIPE_DTYPE = np.dtype(
+    [('grade_id', '<u2'), ('offset', '<i8')] +
+    [(name, '<f8') for name in PIPE_FLOAT_COLUMNS])
+
+
+class PipeTable:
+    """Columnar pipe inventory backed by a NumPy structured array
+
+    Grades are stored as a categorical column: grade_id indexes into
+    grade_names, and grade properties live once in the grades dict instead
+    of being copied into every record. Missing numeric fields are NaN.
+
+    Indexing or iterating yields PipeView objects, which behave like the
+    per-pipe dicts returned by parse_wellcat_data, so existing consumers
+    keep working while aggregations can use the columns directly.
+    """
+
+    def __init__(self, records, grade_names, grades):
+        self.records = records
+        self.grade_names = list(grade_names)
+        self.grades = grades
+
+    @classmethod
+    def from_pipes(cls, pipes, grades):
+        """Build a table from a list of pipe dicts"""
+        grade_names = []
+        grade_ids = {}
+        records = np.zeros(len(pipes), dtype=PIPE_DTYPE)
+        for name in PIPE_FLOAT_COLUMNS:
+            records[name] = np.nan
+
+        for i, pipe in enumerate(pipes):
+            grade = pipe['grade']
+            if grade not in grade_ids:
+                grade_ids[grade] = len(grade_names)
+                grade_names.append(grade)
+            records['grade_id'][i] = grade_ids[grade]
+            records['offset'][i] = pipe.get('offset', -1)
+            for name in PIPE_FLOAT_COLUMNS:
+                if name in pipe:
+                    records[name][i] = pipe[name]
+
+        return cls(records, grade_names, grades)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.records)
+        if not 0 <= index < len(self.records):
+            raise IndexError("pipe index out of range")
+        return PipeView(self, index)
+
+    def __iter__(self):
+        for i in range(len(self.records)):
+            yield PipeView(self, i)
+
+    def column(self, name):
+        """Return a numeric column as an array (NaN where missing)"""
+        return self.records[name]
+
+    @property
+    def grade_ids(self):
+        return self.records['grade_id']
+
+    def grade_column(self):
+        """Return the grade name of every pipe as an object array"""
+        return np.array(self.grade_names, dtype=object)[self.grade_ids]
+
+    def _grade_property_values(self, key):
+        # One value per grade name
+        return np.array(
+            [self.grades.get(name, {}).get(key, np.nan) for name in self.grade_names],
+            dtype=np.float64)
+
+    def grade_property_column(self, key):
+        """Return a grade property (e.g. yield_strength) for every pipe"""
+        return self._grade_property_values(key)[self.grade_ids]
+
+    def grade_counts(self):
+        """Return {grade: count} for the pipes in the table"""
+        counts = np.bincount(self.grade_ids, minlength=len(self.grade_names))
+        return {name: int(count) for name, count in zip(self.grade_names, counts) if count}
+
+    def mean_by_grade(self, name):
+        """Return {grade: mean of column} over the pipes that have a value"""
+        values = self.records[name]
+        present = ~np.isnan(values)
+        ids = self.grade_ids[present]
+        sums = np.bincount(ids, weights=values[present], minlength=len(self.grade_names))
+        counts = np.bincount(ids, minlength=len(self.grade_names))
+        return {self.grade_names[i]: float(sums[i] / counts[i])
+                for i in range(len(self.grade_names)) if counts[i]}
+
+    def value_counts(self, name, decimals=3):
+        """Return {rounded value: count} for a numeric column"""
+        values = self.records[name]
+        values = np.round(values[~np.isnan(values)], decimals)
+        unique, counts = np.unique(values, return_counts=True)
+        return dict(zip(unique.tolist(), counts.tolist()))
+
+    def to_columns(self, start=0, stop=None):
+        """Return {field: array} for every pipe field plus the grade properties
+
+        start/stop select a slice of rows, so exports can work in chunks.
+        """
+        rows = slice(start, stop)
+        ids = self.grade_ids[rows]
+        columns = {'grade': np.array(self.grade_names, dtype=object)[ids]}
+        for name in PIPE_FLOAT_COLUMNS:
+            columns[name] = self.records[name][rows]
+        for key in GRADE_PROPERTY_KEYS:
+            columns[key] = self._grade_property_values(key)[ids]
+        return columns
+
+    def to_dicts(self):
+        """Materialize the table as the list-of-dicts form"""
+        return [dict(pipe) for pipe in self]
+
+
+class PipeView(Mapping):
+    """Read-only dict view of one row of a PipeTable"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def _keys(self):
+        table = self._table
+        row = table.records[self._index]
+        keys = ['grade', 'offset']
+        keys.extend(name for name in PIPE_FLOAT_COLUMNS if not np.isnan(row[name]))
+        if table.grade_names[row['grade_id']] in table.grades:
+            keys.append('grade_properties')
+        return keys
+
+    def __getitem__(self, key):
+        table = self._table
+        row = table.records[self._index]
+        if key == 'grade':
+            return table.grade_names[row['grade_id']]
+        if key == 'offset':
+            return int(row['offset'])
+        if key == 'grade_properties':
+            grade = table.grade_names[row['grade_id']]
+            if grade in table.grades:
+                return table.grades[grade]
+            raise KeyError(key)
+        if key in PIPE_FLOAT_COLUMNS:
+            value = row[key]
+            if not np.isnan(value):
+                return float(value)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def __repr__(self):
+        return f"PipeView({dict(self)!r})"
+
+
+def json_default(obj):
+    """json.dump default hook that serializes a PipeTable as a list of dicts"""
+    if isinstance(obj, PipeTable):
+        return obj.to_dicts()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class InventoryIndex:
+    """Precomputed indexes for filtering and sorting a pipe inventory
+
+    Built once per inventory: an index array per grade, plus a stable argsort
+    and the sorted values of every numeric column (NaN last). A query picks
+    the most selective condition as the driver - a per-grade array or a
+    searchsorted slice of a sorted column - and checks the remaining
+    conditions only on those candidates, so its cost follows the size of the
+    result rather than the size of the inventory.
+    """
+
+    def __init__(self, pipes):
+        table = pipes if isinstance(pipes, PipeTable) else PipeTable.from_pipes(pipes, {})
+        self.count = len(table)
+        self.grade_names = table.grade_names
+        grade_ids = table.grade_ids.astype(np.intp)
+
+        order = np.argsort(grade_ids, kind='stable')
+        bounds = np.searchsorted(grade_ids[order], np.arange(len(self.grade_names) + 1))
+        self.by_grade = {name: order[bounds[i]:bounds[i + 1]]
+                         for i, name in enumerate(self.grade_names)}
+
+        # Sort grades by name rather than by order of first appearance
+        rank = np.empty(len(self.grade_names), dtype=np.float64)
+        rank[np.argsort(np.array(self.grade_names, dtype=object))] = np.arange(len(self.grade_names))
+        self.values = {'grade': rank[grade_ids]}
+        for name in PIPE_FLOAT_COLUMNS:
+            self.values[name] = np.ascontiguousarray(table.column(name), dtype=np.float64)
+
+        self.order = {}
+        self.descending_order = {}
+        self.sorted_values = {}
+        self.valid = {}
+        for name, values in self.values.items():
+            column_order = np.argsort(values, kind='stable')
+            self.order[name] = column_order
+            self.sorted_values[name] = values[column_order]
+            self.valid[name] = valid = int(np.count_nonzero(~np.isnan(values)))
+            self.descending_order[name] = np.concatenate(
+                (column_order[:valid][::-1], column_order[valid:]))
+
+    def _range_slice(self, name, low, high):
+        sorted_values = self.sorted_values[name]
+        start = 0 if low is None else int(np.searchsorted(sorted_values, low, side='left'))
+        stop = self.valid[name] if high is None else int(np.searchsorted(sorted_values, high, side='right'))
+        return start, max(start, stop)
+
+    def query(self, grade=None, ranges=None, sort=None, descending=False):
+        """Return the matching row indices as an array
+
+        grade is an exact grade name, ranges maps a column to (low, high)
+        inclusive bounds (either may be None) and sort is a column name or
+        'grade'. Without sort, rows come back in inventory order. Rows
+        missing the sort value always come last.
+        """
+        # Each condition is (candidate count, candidate rows, test on other rows)
+        conditions = []
+        if grade:
+            rows = self.by_grade.get(grade, np.empty(0, dtype=np.intp))
+            grade_rank = self.values['grade'][rows[0]] if len(rows) else -1.0
+            conditions.append((len(rows), rows, 'grade',
+                               lambda r, v=grade_rank: self.values['grade'][r] == v))
+        for name, (low, high) in (ranges or {}).items():
+            if low is None and high is None:
+                continue
+            start, stop = self._range_slice(name, low, high)
+            conditions.append((stop - start, self.order[name][start:stop], name,
+                               lambda r, n=name, lo=low, hi=high: self._in_range(n, r, lo, hi)))
+
+        if conditions:
+            conditions.sort(key=lambda c: c[0])
+            _, rows, driver, _ = conditions[0]
+            for _, _, _, test in conditions[1:]:
+                rows = rows[test(rows)]
+        else:
+            rows, driver = None, None
+
+        if sort is None:
+            if rows is None:
+                return np.arange(self.count)
+            # Grade candidates are already in inventory order
+            return rows if driver == 'grade' else np.sort(rows)
+
+        order = self.descending_order[sort] if descending else self.order[sort]
+        if rows is None:
+            return order
+        if driver == sort:
+            # Already sorted by the range slice
+            return rows[::-1] if descending else rows
+        if len(rows) * 8 < self.count:
+            # Sort by position first so ties keep inventory order
+            rows = np.sort(rows)
+            rows = rows[np.argsort(self.values[sort][rows], kind='stable')]
+            if descending:
+                present = int(np.count_nonzero(~np.isnan(self.values[sort][rows])))
+                rows = np.concatenate((rows[:present][::-1], rows[present:]))
+            return rows
+        # Large result: reuse the precomputed order instead of sorting again
+        keep = np.zeros(self.count, dtype=bool)
+        keep[rows] = True
+        return order[keep[order]]
+
+    def _in_range(self, name, rows, low, high):
+        values = self.values[name][rows]
+        keep = ~np.isnan(values)
+        if low is not None:
+            keep &= values >= low
+        if high is not None:
+            keep &= values <= high
+        return keep
@@ -1,14 +1,227 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import messagebox, ttk
 import json
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import functools
 import os
+import queue
+import threading
+from wellcat_grades import GRADE_CATALOG
+
+# matplotlib, NumPy (wellcat_table) and the parser are imported where they
+# are first needed, so the window can open before any of them load
+
+# Visualization tabs: (title, method that draws the chart on an Axes)
+CHARTS = (
+    ("Grade Distribution", "_draw_grade_chart"),
+    ("OD Distribution", "_draw_od_chart"),
+    ("Rating Comparison", "_draw_rating_chart")
+)
+
+# How often the Tk thread checks on a background load (ms)
+LOAD_POLL_MS = 50
+
+# Rows materialized before the widget reports its real height
+DEFAULT_VISIBLE_ROWS = 25
+
+# Formatted inventory rows kept around for scrolling back
+ROW_CACHE_SIZE = 4096
+
+# Pipe field behind each sortable inventory column
+INVENTORY_SORT_FIELDS = {
+    "Grade": "grade",
+    "OD (in)": "OD",
+    "Wall (in)": "wall_thickness",
+    "ID (in)": "ID",
+    "Weight (ppf)": "weight",
+    "Burst": "burst_rating",
+    "Collapse": "collapse_rating",
+    "Axial": "axial_rating"
+}
+
+# Range filters under the inventory: (label, pipe field)
+INVENTORY_RANGE_FILTERS = [
+    ("OD (in)", "OD"),
+    ("Wall (in)", "wall_thickness"),
+    ("Weight (ppf)", "weight"),
+    ("Burst", "burst_rating"),
+    ("Collapse", "collapse_rating"),
+    ("Axial", "axial_rating")
+]
+
+
+class VirtualTreeview:
+    """Treeview that only materializes the rows currently in view
+    
+    The tree holds one item per visible line ("slots"). rows is a sequence of
+    row keys (pipe indices); scrolling moves a window over it and rewrites the
+    slot values through format_row, so the cost of scrolling, filtering or
+    sorting depends on the window height rather than the number of rows.
+    """
+    
+    def __init__(self, parent, columns, format_row, row_tags=None, on_select=None):
+        self.format_row = format_row
+        self.row_tags = row_tags or (lambda key: ())
+        self.on_select = on_select
+        self.rows = []
+        self.top = 0
+        self.selected = None
+        self.position = None
+        self.slots = []
+        
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings", selectmode="browse",
+                                 height=DEFAULT_VISIBLE_ROWS)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
+        self._resize_slots(DEFAULT_VISIBLE_ROWS)
+        
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Up>", lambda event: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self.move_selection(-len(self.slots)))
+        self.tree.bind("<Next>", lambda event: self.move_selection(len(self.slots)))
+    
+    def set_rows(self, rows):
+        """Show a new sequence of row keys, keeping the selection if it is still present"""
+        self.rows = rows
+        self.top = 0
+        self.position = self._position_of(self.selected)
+        if self.position is not None:
+            self.top = self._clamp(self.position)
+        self.refresh()
+    
+    def scroll(self, delta):
+        self.top = self._clamp(self.top + delta)
+        self.refresh()
+        return "break"
+    
+    def move_selection(self, delta):
+        """Move the selection by delta rows, scrolling it into view"""
+        if not self.rows:
+            return "break"
+        if self.position is not None:
+            position = self.position + delta
+        else:
+            position = self.top
+        position = max(0, min(position, len(self.rows) - 1))
+        
+        if position < self.top:
+            self.top = position
+        elif position >= self.top + len(self.slots):
+            self.top = self._clamp(position - len(self.slots) + 1)
+        
+        self._select(position)
+        self.refresh()
+        return "break"
+    
+    def refresh(self):
+        """Rewrite the slot items for the current window"""
+        selected_slot = None
+        for i, slot in enumerate(self.slots):
+            position = self.top + i
+            if position < len(self.rows):
+                key = self.rows[position]
+                self.tree.item(slot, values=self.format_row(key), tags=self.row_tags(key))
+                if position == self.position:
+                    selected_slot = slot
+            else:
+                self.tree.item(slot, values=(), tags=())
+        
+        if selected_slot is not None:
+            self.tree.selection_set(selected_slot)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+        
+        total = len(self.rows)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + len(self.slots)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def _clamp(self, top):
+        return max(0, min(top, len(self.rows) - len(self.slots)))
+    
+    def _resize_slots(self, count):
+        while len(self.slots) < count:
+            self.slots.append(self.tree.insert("", "end", iid=f"slot{len(self.slots)}"))
+        while len(self.slots) > count:
+            self.tree.delete(self.slots.pop())
+        self.tree.yview_moveto(0)
+    
+    def _position_of(self, key):
+        if key is None:
+            return None
+        if hasattr(self.rows, 'nonzero'):
+            # NumPy index array from InventoryIndex
+            matches = (self.rows == key).nonzero()[0]
+            return int(matches[0]) if len(matches) else None
+        try:
+            return self.rows.index(key)
+        except ValueError:
+            return None
+    
+    def _select(self, position):
+        self.position = position
+        self.selected = self.rows[position]
+        if self.on_select:
+            self.on_select(self.selected)
+    
+    def _on_configure(self, event):
+        # Fit the number of slots to the height the widget actually got
+        bbox = self.tree.bbox(self.slots[0]) if self.slots else ''
+        if not bbox:
+            return
+        _, y, _, row_height = bbox
+        count = max(1, (event.height - y) // row_height)
+        if count != len(self.slots):
+            self._resize_slots(count)
+            self.top = self._clamp(self.top)
+            self.refresh()
+    
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            top = int(float(amount) * len(self.rows))
+        else:
+            step = int(amount)
+            top = self.top + (step * len(self.slots) if unit == "pages" else step)
+        self.top = self._clamp(top)
+        self.refresh()
+    
+    def _on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+    
+    def _on_tree_select(self, event):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        position = self.top + self.slots.index(selection[0])
+        if position >= len(self.rows):
+            # Blank slot below the last row; put the real selection back
+            self.refresh()
+            return
+        # Ignore the selection refresh() restores for the current row
+        if position != self.position:
+            self._select(position)
+
+
+class LoadCancelled(Exception):
+    """Raised from the progress callback to stop a background parse"""
+
 
 class WellCatViewer:
-    def __init__(self, master, data):
+    def __init__(self, master, data=None, source=None, parse=None):
         self.master = master
-        self.data = data
+        self.data = None
+        self.source = source
+        # Parse entry point for source (parse_wellcat_data when None); e.g.
+        # analyser.parse_edm_file to load a raw EDM export in memory
+        self.parse = parse
+        
+        # Background load state (see load())
+        self._load_queue = None
+        self._load_cancel = None
         
         master.title("WellCat Data Viewer - Wellbore Pipe Inventory")
         master.geometry("1100x700")
@@ -30,21 +243,163 @@ class WellCatViewer:
         self.notebook.add(self.pipe_detail_frame, text="Pipe Details")
         self.notebook.add(self.graph_frame, text="Visualization")
         
-        # Populate tabs
-        self.populate_summary()
-        self.populate_inventory()
-        self.populate_grades()
-        self.create_visualization()
-        
         # Selected pipe for details view
         self.selected_pipe = None
         
+        # Charts are drawn lazily (see render_visible_chart)
+        self.viz_notebook = None
+        self.chart_figures = {}
+        self.charts_drawn = set()
+        self.chart_cache = {}
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        
         # Export buttons
         button_frame = ttk.Frame(master)
         button_frame.pack(fill="x", padx=10, pady=5)
         
         ttk.Button(button_frame, text="Export as JSON", command=self.export_json).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Export as Binary", command=self.export_binary).pack(side="left", padx=5)
         ttk.Button(button_frame, text="Export as Excel", command=self.export_excel).pack(side="left", padx=5)
+        
+        # Load controls and progress
+        ttk.Button(button_frame, text="Reload", command=self.reload).pack(side="left", padx=5)
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel_load, state="disabled")
+        self.cancel_button.pack(side="left", padx=5)
+        self.progress_bar = ttk.Progressbar(button_frame, mode="determinate", maximum=100, length=200)
+        self.progress_bar.pack(side="left", padx=15)
+        self.status_label = ttk.Label(button_frame, text="")
+        self.status_label.pack(side="left", padx=5)
+        
+        # Populate tabs
+        if data is not None:
+            self.set_data(data)
+        elif source is not None:
+            self.load(source)
+    
+    def set_data(self, data):
+        """Show a parse result, filling the tabs one at a time"""
+        self.data = data
+        self.selected_pipe = None
+        self.charts_drawn = set()
+        self.chart_cache = {}
+        
+        # Summary first; the other tabs follow between event loop turns so
+        # the window stays responsive while they are built
+        self._clear(self.summary_frame)
+        self.populate_summary()
+        steps = [(self.inventory_frame, self.populate_inventory),
+                 (self.grades_frame, self.populate_grades),
+                 (self.pipe_detail_frame, self.show_pipe_details),
+                 (None, self.create_visualization)]
+        self.master.after(1, self._populate_next, data, steps)
+    
+    def _populate_next(self, data, steps):
+        # A newer load replaced the data before this step ran
+        if data is not self.data or not steps:
+            return
+        frame, populate = steps[0]
+        if frame is not None:
+            self._clear(frame)
+        populate()
+        self.master.after(1, self._populate_next, data, steps[1:])
+    
+    @staticmethod
+    def _clear(frame):
+        for widget in frame.winfo_children():
+            widget.destroy()
+    
+    def load(self, source):
+        """Parse source in a worker thread and show the result when it arrives"""
+        self.cancel_load()
+        self.source = source
+        
+        # Each load gets its own queue and cancel flag, so a cancelled
+        # worker that is still finishing can never post into a newer load
+        self._load_queue = queue.Queue()
+        self._load_cancel = threading.Event()
+        worker = threading.Thread(target=self._load_worker,
+                                  args=(source, self.parse, self._load_cancel, self._load_queue), daemon=True)
+        worker.start()
+        
+        self.cancel_button.config(state="normal")
+        self.progress_bar.config(value=0)
+        self.status_label.config(text=f"Loading {os.path.basename(source)}...")
+        if self.data is None:
+            self._clear(self.summary_frame)
+            ttk.Label(self.summary_frame, text=f"Loading {source}...", font=("Arial", 12)).pack(
+                anchor="w", padx=20, pady=20)
+        self.master.after(LOAD_POLL_MS, self._poll_load, self._load_queue)
+    
+    def reload(self):
+        if self.source is not None:
+            self.load(self.source)
+    
+    def cancel_load(self):
+        if self._load_cancel is not None:
+            self._load_cancel.set()
+            self._load_cancel = None
+            self._load_queue = None
+            self.cancel_button.config(state="disabled")
+            self.progress_bar.config(value=0)
+            self.status_label.config(text="Load cancelled")
+    
+    @staticmethod
+    def _load_worker(source, parse, cancel, messages):
+        # Runs off the Tk thread: only talks to the UI through the queue
+        def progress(stage, done, total):
+            if cancel.is_set():
+                raise LoadCancelled()
+            messages.put(('progress', stage, done, total))
+        
+        try:
+            from wellcat_cache import cached_parse
+            from wellcat_parser import parse_wellcat_data
+            messages.put(('done', cached_parse(source, parse=parse or parse_wellcat_data, progress=progress)))
+        except LoadCancelled:
+            pass
+        except Exception as e:
+            messages.put(('error', f"{type(e).__name__}: {e}"))
+    
+    def _poll_load(self, messages):
+        if messages is not self._load_queue:
+            return
+        
+        # Drain the queue; only the latest progress message matters
+        latest = None
+        try:
+            while True:
+                message = messages.get_nowait()
+                if message[0] != 'progress':
+                    latest = message
+                    break
+                latest = message
+        except queue.Empty:
+            pass
+        
+        if latest is None or latest[0] == 'progress':
+            if latest is not None:
+                _, stage, done, total = latest
+                self._show_progress(stage, done, total)
+            self.master.after(LOAD_POLL_MS, self._poll_load, messages)
+            return
+        
+        self._load_queue = None
+        self._load_cancel = None
+        self.cancel_button.config(state="disabled")
+        if latest[0] == 'done':
+            self.progress_bar.config(value=100)
+            self.status_label.config(text=f"Loaded {os.path.basename(self.source)}")
+            self.set_data(latest[1])
+        else:
+            self.progress_bar.config(value=0)
+            self.status_label.config(text=f"Load failed: {latest[1]}")
+    
+    def _show_progress(self, stage, done, total):
+        from wellcat_parser import PARSE_STAGES
+        if stage in PARSE_STAGES:
+            position = PARSE_STAGES.index(stage) + (done / total if total else 0)
+            self.progress_bar.config(value=100 * position / len(PARSE_STAGES))
+        self.status_label.config(text=f"Parsing: {stage.replace('_', ' ')}")
     
     def populate_summary(self):
         # Create header
@@ -110,7 +465,11 @@ class WellCatViewer:
         tree_frame = ttk.Frame(self.inventory_frame)
         tree_frame.pack(expand=True, fill="both", padx=10, pady=10)
         
-        self.inventory_tree = ttk.Treeview(tree_frame, columns=columns, show="headings", selectmode="browse")
+        # Only the visible window of rows is materialized; cells are formatted on demand
+        self._format_row = functools.lru_cache(maxsize=ROW_CACHE_SIZE)(self._format_pipe_row)
+        self.inventory_view = VirtualTreeview(tree_frame, columns, self._format_row,
+                                              row_tags=self._pipe_row_tags, on_select=self.on_pipe_select)
+        self.inventory_tree = self.inventory_view.tree
         
         # Configure columns
         self.inventory_tree.heading("Grade", text="Grade")
@@ -124,20 +483,12 @@ class WellCatViewer:
         
         for col in columns:
             self.inventory_tree.column(col, width=100, anchor="center")
+            self.inventory_tree.heading(col, command=lambda c=col: self.sort_inventory(c))
         
-        # Add pipe data
-        for i, pipe in enumerate(self.data['pipes']):
-            values = (
-                pipe['grade'],
-                f"{pipe.get('OD', 0):.3f}",
-                f"{pipe.get('wall_thickness', 0):.3f}",
-                f"{pipe.get('ID', 0):.3f}",
-                f"{pipe.get('weight', 0):.1f}" if 'weight' in pipe else "",
-                f"{pipe.get('burst_rating', 0):.1f}" if 'burst_rating' in pipe else "",
-                f"{pipe.get('collapse_rating', 0):.1f}" if 'collapse_rating' in pipe else "",
-                f"{pipe.get('axial_rating', 0):.1f}" if 'axial_rating' in pipe else ""
-            )
-            self.inventory_tree.insert("", "end", iid=str(i), values=values, tags=(pipe['grade'],))
+        # Click a heading to sort, click again to reverse
+        self.inventory_headings = {col: self.inventory_tree.heading(col, "text") for col in columns}
+        self.sort_column = None
+        self.sort_descending = False
         
         # Color rows by grade
         grade_colors = {
@@ -155,28 +506,30 @@ class WellCatViewer:
             self.inventory_tree.tag_configure(grade, background=color)
         
         # Handle specialized grades (L-80X9, etc)
-        for pipe in self.data['pipes']:
-            grade = pipe['grade']
+        for grade in set(self.data['grades']) | set(self.data['well_info'].get('grade_distribution', {})):
             if grade not in grade_colors:
-                base_grade = grade.split('X')[0] if 'X' in grade else grade.rstrip('k9')
+                base_grade = GRADE_CATALOG.base_grade(grade)
                 if base_grade in grade_colors:
                     self.inventory_tree.tag_configure(grade, background=grade_colors[base_grade])
         
-        # Add scrollbars
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=self.inventory_tree.yview)
+        # Add scrollbars (the vertical one belongs to the virtual view)
         hsb = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.inventory_tree.xview)
-        self.inventory_tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        self.inventory_tree.configure(xscrollcommand=hsb.set)
         
         # Grid layout
         self.inventory_tree.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
+        self.inventory_view.scrollbar.grid(row=0, column=1, sticky="ns")
         hsb.grid(row=1, column=0, sticky="ew")
         
         tree_frame.rowconfigure(0, weight=1)
         tree_frame.columnconfigure(0, weight=1)
         
-        # Bind selection event
-        self.inventory_tree.bind("<<TreeviewSelect>>", self.on_pipe_select)
+        # Per-grade and per-column indexes behind filtering and sorting
+        from wellcat_table import InventoryIndex
+        self.inventory_index = InventoryIndex(self.data['pipes'])
+        
+        # Show every pipe
+        self.inventory_view.set_rows(self.inventory_index.query())
         
         # Filter options
         filter_frame = ttk.LabelFrame(self.inventory_frame, text="Filter Options")
@@ -184,14 +537,41 @@ class WellCatViewer:
         
         ttk.Label(filter_frame, text="Grade:").grid(row=0, column=0, padx=5, pady=5)
         self.grade_var = tk.StringVar()
+        grade_names = list(self.data['grades'].keys())
+        grade_names += [g for g in self.inventory_index.grade_names if g not in self.data['grades']]
         grade_combo = ttk.Combobox(filter_frame, textvariable=self.grade_var, 
-                                   values=[""] + list(self.data['grades'].keys()))
-        grade_combo.grid(row=0, column=1, padx=5, pady=5)
-        
-        ttk.Button(filter_frame, text="Apply Filter", 
-                  command=self.apply_filter).grid(row=0, column=2, padx=5, pady=5)
-        ttk.Button(filter_frame, text="Clear Filter", 
-                  command=self.clear_filter).grid(row=0, column=3, padx=5, pady=5)
+                                   values=[""] + grade_names)
+        grade_combo.grid(row=0, column=1, columnspan=3, sticky="w", padx=5, pady=5)
+        grade_combo.bind("<<ComboboxSelected>>", lambda event: self.apply_filter())
+        
+        # Min/max entries, three filters per row
+        self.range_vars = {}
+        for i, (label, field) in enumerate(INVENTORY_RANGE_FILTERS):
+            row = 1 + i // 3
+            column = (i % 3) * 4
+            min_var = tk.StringVar()
+            max_var = tk.StringVar()
+            self.range_vars[field] = (min_var, max_var)
+            
+            ttk.Label(filter_frame, text=f"{label}:").grid(row=row, column=column, sticky="e", padx=5, pady=5)
+            min_entry = ttk.Entry(filter_frame, textvariable=min_var, width=8)
+            min_entry.grid(row=row, column=column + 1, pady=5)
+            ttk.Label(filter_frame, text="to").grid(row=row, column=column + 2, padx=2, pady=5)
+            max_entry = ttk.Entry(filter_frame, textvariable=max_var, width=8)
+            max_entry.grid(row=row, column=column + 3, pady=5)
+            
+            min_entry.bind("<Return>", lambda event: self.apply_filter())
+            max_entry.bind("<Return>", lambda event: self.apply_filter())
+        
+        button_frame = ttk.Frame(filter_frame)
+        button_frame.grid(row=3, column=0, columnspan=12, sticky="w", pady=5)
+        ttk.Button(button_frame, text="Apply Filter", 
+                  command=self.apply_filter).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Clear Filter", 
+                  command=self.clear_filter).pack(side="left", padx=5)
+        
+        self.filter_status = ttk.Label(button_frame, text=f"{len(self.data['pipes'])} pipes")
+        self.filter_status.pack(side="left", padx=15)
     
     def populate_grades(self):
         # Create tree view for grade properties
@@ -246,12 +626,25 @@ class WellCatViewer:
         tree_frame.rowconfigure(0, weight=1)
         tree_frame.columnconfigure(0, weight=1)
     
-    def on_pipe_select(self, event):
-        selected_items = self.inventory_tree.selection()
-        if selected_items:
-            index = int(selected_items[0])
-            self.selected_pipe = self.data['pipes'][index]
-            self.show_pipe_details()
+    def _format_pipe_row(self, index):
+        pipe = self.data['pipes'][index]
+        return (
+            pipe['grade'],
+            f"{pipe.get('OD', 0):.3f}",
+            f"{pipe.get('wall_thickness', 0):.3f}",
+            f"{pipe.get('ID', 0):.3f}",
+            f"{pipe.get('weight', 0):.1f}" if 'weight' in pipe else "",
+            f"{pipe.get('burst_rating', 0):.1f}" if 'burst_rating' in pipe else "",
+            f"{pipe.get('collapse_rating', 0):.1f}" if 'collapse_rating' in pipe else "",
+            f"{pipe.get('axial_rating', 0):.1f}" if 'axial_rating' in pipe else ""
+        )
+    
+    def _pipe_row_tags(self, index):
+        return (self.data['pipes'][index]['grade'],)
+    
+    def on_pipe_select(self, index):
+        self.selected_pipe = self.data['pipes'][index]
+        self.show_pipe_details()
     
     def show_pipe_details(self):
         # Clear previous content
@@ -325,25 +718,59 @@ class WellCatViewer:
                 row=i, column=1, sticky="w", padx=10, pady=5)
     
     def create_visualization(self):
-        # Clear previous content
-        for widget in self.graph_frame.winfo_children():
-            widget.destroy()
-        
-        # Create tabs for different visualizations
-        viz_notebook = ttk.Notebook(self.graph_frame)
-        viz_notebook.pack(expand=True, fill="both", padx=10, pady=10)
+        # The chart tabs are built once and reused across reloads; each chart
+        # is drawn the first time its tab is shown for the current data
+        if self.viz_notebook is None:
+            self.viz_notebook = ttk.Notebook(self.graph_frame)
+            self.viz_notebook.pack(expand=True, fill="both", padx=10, pady=10)
+            
+            for title, _ in CHARTS:
+                self.viz_notebook.add(ttk.Frame(self.viz_notebook), text=title)
+            
+            self.viz_notebook.bind("<<NotebookTabChanged>>", lambda event: self.render_visible_chart())
         
-        dist_frame = ttk.Frame(viz_notebook)
-        od_frame = ttk.Frame(viz_notebook)
-        rating_frame = ttk.Frame(viz_notebook)
+        self.render_visible_chart()
+    
+    def _on_tab_changed(self, event):
+        if self.notebook.select() == str(self.graph_frame):
+            self.render_visible_chart()
+    
+    def render_visible_chart(self):
+        """Draw the selected chart if it is on screen and not drawn for this data yet"""
+        if self.data is None or self.viz_notebook is None:
+            return
+        if self.notebook.select() != str(self.graph_frame):
+            return
         
-        viz_notebook.add(dist_frame, text="Grade Distribution")
-        viz_notebook.add(od_frame, text="OD Distribution")
-        viz_notebook.add(rating_frame, text="Rating Comparison")
+        index = self.viz_notebook.index(self.viz_notebook.select())
+        if index in self.charts_drawn:
+            return
         
+        # Reuse the figure and canvas; only the axes are redrawn
+        if index not in self.chart_figures:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            
+            frame = self.viz_notebook.nametowidget(self.viz_notebook.tabs()[index])
+            figure = Figure(figsize=(8, 5))
+            canvas = FigureCanvasTkAgg(figure, frame)
+            canvas.get_tk_widget().pack(expand=True, fill="both")
+            self.chart_figures[index] = (figure, canvas)
+        
+        figure, canvas = self.chart_figures[index]
+        figure.clf()
+        getattr(self, CHARTS[index][1])(figure.add_subplot(111))
+        canvas.draw_idle()
+        self.charts_drawn.add(index)
+    
+    def _chart_data(self, name, compute):
+        # Aggregations are computed once per data set
+        if name not in self.chart_cache:
+            self.chart_cache[name] = compute()
+        return self.chart_cache[name]
+    
+    def _draw_grade_chart(self, ax):
         # Grade distribution chart
-        fig1, ax1 = plt.subplots(figsize=(8, 5))
-        
         grade_counts = self.data['well_info'].get('grade_distribution', {})
         grades = list(grade_counts.keys())
         counts = [grade_counts[g] for g in grades]
@@ -351,145 +778,177 @@ class WellCatViewer:
         colors = ['#FF6666', '#FFAA66', '#FFFF66', '#66FF66', '#66FFFF', '#6666FF', '#FF66FF', 
                  '#FFBBBB', '#FFEEBB', '#EEFFBB', '#BBEEBB', '#BBCCFF', '#EECCFF']
         
-        ax1.bar(grades, counts, color=colors[:len(grades)])
-        ax1.set_title('Pipe Grade Distribution')
-        ax1.set_xlabel('Grade')
-        ax1.set_ylabel('Count')
-        
-        # Embed in tkinter
-        canvas1 = FigureCanvasTkAgg(fig1, dist_frame)
-        canvas1.draw()
-        canvas1.get_tk_widget().pack(expand=True, fill="both")
-        
-        # OD distribution chart
-        fig2, ax2 = plt.subplots(figsize=(8, 5))
+        ax.bar(grades, counts, color=colors[:len(grades)])
+        ax.set_title('Pipe Grade Distribution')
+        ax.set_xlabel('Grade')
+        ax.set_ylabel('Count')
+    
+    def _od_counts(self):
+        from wellcat_table import PipeTable
+        pipes = self.data['pipes']
+        if isinstance(pipes, PipeTable):
+            return pipes.value_counts('OD', decimals=3)
         
         od_values = {}
-        for pipe in self.data['pipes']:
+        for pipe in pipes:
             if 'OD' in pipe:
                 od = round(pipe['OD'], 3)
                 if od in od_values:
                     od_values[od] += 1
                 else:
                     od_values[od] = 1
+        return od_values
+    
+    def _draw_od_chart(self, ax):
+        # OD distribution chart
+        od_values = self._chart_data('od_counts', self._od_counts)
         
         ods = list(od_values.keys())
         od_counts = [od_values[od] for od in ods]
         
-        ax2.bar(ods, od_counts, color='lightblue')
-        ax2.set_title('Pipe OD Distribution')
-        ax2.set_xlabel('OD (inches)')
-        ax2.set_ylabel('Count')
-        
-        # Embed in tkinter
-        canvas2 = FigureCanvasTkAgg(fig2, od_frame)
-        canvas2.draw()
-        canvas2.get_tk_widget().pack(expand=True, fill="both")
-        
-        # Rating comparison chart
-        fig3, ax3 = plt.subplots(figsize=(8, 5))
-        
-        # Group by grade
-        grade_ratings = {}
-        for pipe in self.data['pipes']:
-            grade = pipe['grade']
-            if grade not in grade_ratings:
-                grade_ratings[grade] = {'burst': [], 'collapse': [], 'axial': []}
-            
-            if 'burst_rating' in pipe:
-                grade_ratings[grade]['burst'].append(pipe['burst_rating'])
-            if 'collapse_rating' in pipe:
-                grade_ratings[grade]['collapse'].append(pipe['collapse_rating'])
-            if 'axial_rating' in pipe:
-                grade_ratings[grade]['axial'].append(pipe['axial_rating'])
-        
-        # Calculate averages
+        ax.bar(ods, od_counts, color='lightblue')
+        ax.set_title('Pipe OD Distribution')
+        ax.set_xlabel('OD (inches)')
+        ax.set_ylabel('Count')
+    
+    def _rating_averages(self):
+        # Average ratings by grade
+        from wellcat_table import PipeTable
+        pipes = self.data['pipes']
         grades = []
         burst_avgs = []
         collapse_avgs = []
         
-        for grade, ratings in grade_ratings.items():
-            if ratings['burst'] and ratings['collapse']:
-                grades.append(grade)
-                burst_avgs.append(sum(ratings['burst']) / len(ratings['burst']))
-                collapse_avgs.append(sum(ratings['collapse']) / len(ratings['collapse']))
+        if isinstance(pipes, PipeTable):
+            burst_means = pipes.mean_by_grade('burst_rating')
+            collapse_means = pipes.mean_by_grade('collapse_rating')
+            for grade in burst_means:
+                if grade in collapse_means:
+                    grades.append(grade)
+                    burst_avgs.append(burst_means[grade])
+                    collapse_avgs.append(collapse_means[grade])
+        else:
+            # Group by grade
+            grade_ratings = {}
+            for pipe in pipes:
+                grade = pipe['grade']
+                if grade not in grade_ratings:
+                    grade_ratings[grade] = {'burst': [], 'collapse': [], 'axial': []}
+                
+                if 'burst_rating' in pipe:
+                    grade_ratings[grade]['burst'].append(pipe['burst_rating'])
+                if 'collapse_rating' in pipe:
+                    grade_ratings[grade]['collapse'].append(pipe['collapse_rating'])
+                if 'axial_rating' in pipe:
+                    grade_ratings[grade]['axial'].append(pipe['axial_rating'])
+            
+            # Calculate averages
+            for grade, ratings in grade_ratings.items():
+                if ratings['burst'] and ratings['collapse']:
+                    grades.append(grade)
+                    burst_avgs.append(sum(ratings['burst']) / len(ratings['burst']))
+                    collapse_avgs.append(sum(ratings['collapse']) / len(ratings['collapse']))
         
         # Sort by grade
         sorted_indices = sorted(range(len(grades)), key=lambda i: grades[i])
         grades = [grades[i] for i in sorted_indices]
         burst_avgs = [burst_avgs[i] for i in sorted_indices]
         collapse_avgs = [collapse_avgs[i] for i in sorted_indices]
+        return grades, burst_avgs, collapse_avgs
+    
+    def _draw_rating_chart(self, ax):
+        # Rating comparison chart
+        grades, burst_avgs, collapse_avgs = self._chart_data('rating_averages', self._rating_averages)
         
         x = range(len(grades))
         width = 0.35
         
-        ax3.bar([i - width/2 for i in x], burst_avgs, width, label='Burst Rating', color='green')
-        ax3.bar([i + width/2 for i in x], collapse_avgs, width, label='Collapse Rating', color='blue')
-        
-        ax3.set_title('Average Ratings by Grade')
-        ax3.set_xlabel('Grade')
-        ax3.set_ylabel('Rating')
-        ax3.set_xticks(x)
-        ax3.set_xticklabels(grades)
-        ax3.legend()
+        ax.bar([i - width/2 for i in x], burst_avgs, width, label='Burst Rating', color='green')
+        ax.bar([i + width/2 for i in x], collapse_avgs, width, label='Collapse Rating', color='blue')
         
-        # Embed in tkinter
-        canvas3 = FigureCanvasTkAgg(fig3, rating_frame)
-        canvas3.draw()
-        canvas3.get_tk_widget().pack(expand=True, fill="both")
+        ax.set_title('Average Ratings by Grade')
+        ax.set_xlabel('Grade')
+        ax.set_ylabel('Rating')
+        ax.set_xticks(x)
+        ax.set_xticklabels(grades)
+        ax.legend()
     
     def apply_filter(self):
-        grade = self.grade_var.get()
-        
-        # Clear current view
-        for item in self.inventory_tree.get_children():
-            self.inventory_tree.delete(item)
-        
-        # Add filtered data
-        for i, pipe in enumerate(self.data['pipes']):
-            if not grade or pipe['grade'] == grade:
-                values = (
-                    pipe['grade'],
-                    f"{pipe.get('OD', 0):.3f}",
-                    f"{pipe.get('wall_thickness', 0):.3f}",
-                    f"{pipe.get('ID', 0):.3f}",
-                    f"{pipe.get('weight', 0):.1f}" if 'weight' in pipe else "",
-                    f"{pipe.get('burst_rating', 0):.1f}" if 'burst_rating' in pipe else "",
-                    f"{pipe.get('collapse_rating', 0):.1f}" if 'collapse_rating' in pipe else "",
-                    f"{pipe.get('axial_rating', 0):.1f}" if 'axial_rating' in pipe else ""
-                )
-                self.inventory_tree.insert("", "end", iid=str(i), values=values, tags=(pipe['grade'],))
+        ranges = {}
+        for field, (min_var, max_var) in self.range_vars.items():
+            try:
+                low = float(min_var.get()) if min_var.get().strip() else None
+                high = float(max_var.get()) if max_var.get().strip() else None
+            except ValueError:
+                messagebox.showerror("Filter Error", f"Invalid number in the {field} filter")
+                return
+            ranges[field] = (low, high)
+        
+        # Indexed query; the view only re-renders the visible window
+        rows = self.inventory_index.query(self.grade_var.get(), ranges,
+                                          INVENTORY_SORT_FIELDS.get(self.sort_column),
+                                          self.sort_descending)
+        self.inventory_view.set_rows(rows)
+        self.filter_status.config(text=f"{len(rows)} of {len(self.data['pipes'])} pipes")
+    
+    def sort_inventory(self, column):
+        if column == self.sort_column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = column
+            self.sort_descending = False
+        
+        # Mark the sorted column in its heading
+        for col, text in self.inventory_headings.items():
+            if col == column:
+                text += " \u25bc" if self.sort_descending else " \u25b2"
+            self.inventory_tree.heading(col, text=text)
+        
+        self.apply_filter()
     
     def clear_filter(self):
         self.grade_var.set("")
+        for min_var, max_var in self.range_vars.values():
+            min_var.set("")
+            max_var.set("")
         self.apply_filter()
     
     def export_json(self):
+        if self.data is None:
+            return
+        from wellcat_table import json_default
         filename = "wellcat_data.json"
         with open(filename, 'w') as f:
-            json.dump(self.data, f, indent=2)
-        tk.messagebox.showinfo("Export Complete", f"Data exported to {filename}")
+            json.dump(self.data, f, separators=(',', ':'), default=json_default)
+        messagebox.showinfo("Export Complete", f"Data exported to {filename}")
+    
+    def export_binary(self):
+        if self.data is None:
+            return
+        from wellcat_export import save_binary
+        filename = save_binary(self.data, "wellcat_data.wcb")
+        messagebox.showinfo("Export Complete", f"Data exported to {filename}")
     
     def export_excel(self):
+        if self.data is None:
+            return
         try:
             from wellcat_parser import export_to_excel
-            if export_to_excel(self.data):
-                tk.messagebox.showinfo("Export Complete", "Data exported to wellcat_data.xlsx")
+            # Streaming write keeps memory flat on large inventories
+            if export_to_excel(self.data, streaming=True):
+                messagebox.showinfo("Export Complete", "Data exported to wellcat_data.xlsx")
         except ImportError:
-            tk.messagebox.showerror("Export Error", "pandas module not found. Install with: pip install pandas openpyxl")
+            messagebox.showerror("Export Error", "pandas module not found. Install with: pip install pandas openpyxl")
 
 # Usage
 if __name__ == "__main__":
-    from wellcat_parser import parse_wellcat_data
-    
     current_dir = os.path.dirname(os.path.abspath(__file__))
     contents_file = os.path.join(current_dir, "file.txt_streams", "Contents")
     
     if os.path.exists(contents_file):
-        result = parse_wellcat_data(contents_file)
-        
+        # The window opens right away and fills in once the parse finishes
         root = tk.Tk()
-        app = WellCatViewer(root, result)
+        app = WellCatViewer(root, source=contents_file)
         root.mainloop()
     else:
         print(f"File not found: {contents_file}")
\ No newline at end of file